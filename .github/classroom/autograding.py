@@ -1,102 +1,364 @@
 #!/usr/bin/env python3
 """
 GitHub Classroom 自动评分脚本
+
+各测试文件在独立的子进程中并行运行。每个测试文件的结果按
+(被测源文件, 测试文件, 参考解答, 数据文件, Python及依赖版本) 的哈希值缓存，
+提交内容未变时直接使用缓存结果。缓存目录由评分程序控制，必须位于提交目录
+之外，提交中附带的任何缓存文件都不会被读取。score.json中记录每个测试用例
+的耗时和峰值内存；峰值内存在另一个子进程中用tracemalloc单独测量，
+不影响耗时。
+
+用法:
+    python .github/classroom/autograding.py [提交目录 ...] [--workers N]
+                                            [--cache-dir 目录] [--no-cache]
+                                            [--no-memory]
 """
 
 import os
 import sys
 import json
+import glob
+import hashlib
+import argparse
+import importlib.metadata
 import subprocess
+import tempfile
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
 import pytest
 from pathlib import Path
 
-# 定义测试文件和分数
+# 定义测试文件、被测源文件和分数
 TESTS = [
-    {"name": "Logistic映射", "file": "tests/test_logistic.py", "points": 10},
-    {"name": "细菌生长模型", "file": "tests/test_bacteria_model.py", "points": 10},
-    {"name": "HIV病毒载量模型", "file": "tests/test_hiv_model.py", "points": 10},
-    {"name": "Millikan实验", "file": "tests/test_millikan.py", "points": 10}
+    {"name": "Logistic映射", "file": "tests/test_logistic.py",
+     "source": "src/logistic_map_student.py", "points": 10},
+    {"name": "细菌生长模型", "file": "tests/test_bacteria_model.py",
+     "source": "src/bacteria_model_student.py", "points": 10},
+    {"name": "HIV病毒载量模型", "file": "tests/test_hiv_model.py",
+     "source": "src/hiv_model_student.py", "points": 10},
+    {"name": "Millikan实验", "file": "tests/test_millikan.py",
+     "source": "src/millikan_fit_student.py", "points": 10}
 ]
 
-def run_test(test_file):
-    """运行单个测试文件并返回结果"""
-    result = pytest.main(["-v", test_file])
-    return result == 0  # 0表示测试通过
+# 测试同时依赖的参考解答和数据文件，变化时缓存失效
+SHARED_SOURCES = ("solutions/*.py", "data/*")
+# 版本变化时缓存失效的依赖包
+DEPENDENCIES = ("numpy", "pytest", "matplotlib")
+# 默认缓存目录，可用环境变量AUTOGRADE_CACHE_DIR或--cache-dir覆盖
+DEFAULT_CACHE_DIR = os.environ.get(
+    "AUTOGRADE_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "autograde"))
+# 单个测试文件的超时时间和判定为慢的耗时（秒）
+TEST_TIMEOUT = 600
+SLOW_TEST_SECONDS = 10.0
+
+class _CaseRecorder:
+    """
+    pytest插件：记录每个测试用例的结果和耗时；trace_memory为True时只用于
+    测量峰值内存，此时记录的耗时包含tracemalloc的开销，不应使用
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.cases = {}
+
+    def _case(self, nodeid):
+        return self.cases.setdefault(
+            nodeid, {"outcome": "passed", "duration": 0.0, "peak_memory": None})
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_call(self, item):
+        if not self.trace_memory:
+            yield
+            return
+        tracemalloc.start()
+        try:
+            yield
+        finally:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self._case(item.nodeid)["peak_memory"] = peak
+
+    def pytest_collectreport(self, report):
+        if report.failed:
+            self._case(report.nodeid)["outcome"] = "error"
+
+    def pytest_runtest_logreport(self, report):
+        case = self._case(report.nodeid)
+        case["duration"] += report.duration
+        if report.failed:
+            case["outcome"] = "failed"
+        elif report.skipped and case["outcome"] == "passed":
+            case["outcome"] = "skipped"
+
+def run_worker(test_file, output, trace_memory=False):
+    """子进程入口：运行一个测试文件，把结果写入output"""
+    recorder = _CaseRecorder(trace_memory)
+    exit_code = pytest.main(["-v", test_file], plugins=[recorder])
+    result = {
+        "exit_code": int(exit_code),
+        "cases": [dict(nodeid=nodeid, **case) for nodeid, case in recorder.cases.items()],
+    }
+    try:
+        import resource
+        # Linux上ru_maxrss的单位为KB
+        result["peak_rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except ImportError:
+        pass
+    with open(output, 'w') as f:
+        json.dump(result, f)
+
+def _file_digest(h, root, path):
+    h.update(path.encode())
+    full = os.path.join(root, path)
+    if os.path.exists(full):
+        with open(full, 'rb') as f:
+            h.update(hashlib.sha256(f.read()).digest())
+    else:
+        h.update(b"missing")
+
+def _dependency_versions():
+    versions = []
+    for name in DEPENDENCIES:
+        try:
+            versions.append(f"{name}=={importlib.metadata.version(name)}")
+        except importlib.metadata.PackageNotFoundError:
+            versions.append(f"{name} missing")
+    return ";".join(versions)
 
-def calculate_score():
+def cache_key(root, test, trace_memory=True):
+    """测试结果的缓存键"""
+    h = hashlib.sha256(sys.version.encode())
+    h.update(_dependency_versions().encode())
+    h.update(b"memory" if trace_memory else b"no-memory")
+    shared = sorted(os.path.relpath(p, root) for pattern in SHARED_SOURCES
+                    for p in glob.glob(os.path.join(root, pattern)) if os.path.isfile(p))
+    for path in [test["source"], test["file"]] + shared:
+        _file_digest(h, root, path)
+    return h.hexdigest()
+
+def _run_worker(root, test, trace_memory):
+    """在子进程中运行一个测试文件，返回其结果字典"""
+    fd, output = tempfile.mkstemp(suffix=".json")
+    os.close(fd)
+    try:
+        args = [sys.executable, os.path.abspath(__file__),
+                "--worker-memory" if trace_memory else "--worker", test["file"], output]
+        completed = subprocess.run(args, cwd=root, capture_output=True, text=True,
+                                   timeout=TEST_TIMEOUT)
+        with open(output) as f:
+            result = json.load(f)
+        result["log"] = completed.stdout + completed.stderr
+        return result
+    finally:
+        if os.path.exists(output):
+            os.remove(output)
+
+def run_test(root, test, cache_dir=None, trace_memory=True):
+    """
+    运行单个测试文件并返回结果
+
+    先运行一次测试记录结果和耗时；trace_memory为True时再在另一个子进程中
+    开启tracemalloc运行一次，只取各用例的峰值内存。
+
+    参数:
+        root: 提交目录
+        test: TESTS中的一项
+        cache_dir: 结果缓存目录，None时不使用缓存
+        trace_memory: 是否测量每个用例的峰值内存
+
+    返回:
+        result: 含exit_code、cases、duration和cached的字典
+    """
+    cache_file = None
+    if cache_dir is not None:
+        cache_file = os.path.join(cache_dir, cache_key(root, test, trace_memory) + ".json")
+        if os.path.exists(cache_file):
+            with open(cache_file) as f:
+                result = json.load(f)
+            result["cached"] = True
+            return result
+
+    try:
+        result = _run_worker(root, test, trace_memory=False)
+    except subprocess.TimeoutExpired:
+        result = {"exit_code": -1, "cases": [], "log": f"超时（{TEST_TIMEOUT}秒）"}
+    except (OSError, ValueError) as e:
+        result = {"exit_code": -1, "cases": [], "log": f"测试进程异常退出: {e}"}
+
+    if trace_memory and result["exit_code"] >= 0:
+        try:
+            peaks = {case["nodeid"]: case["peak_memory"]
+                     for case in _run_worker(root, test, trace_memory=True)["cases"]}
+        except (subprocess.TimeoutExpired, OSError, ValueError):
+            peaks = {}
+        for case in result["cases"]:
+            case["peak_memory"] = peaks.get(case["nodeid"])
+
+    result["duration"] = sum(case["duration"] for case in result["cases"])
+    # 超时或异常退出的结果不缓存，下次重新运行
+    if cache_file is not None and result["exit_code"] >= 0:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = cache_file + f".{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(result, f)
+        os.replace(tmp, cache_file)
+    result["cached"] = False
+    return result
+
+def calculate_score(root, results):
     """计算总分并生成结果报告"""
     total_points = 0
     max_points = 0
-    results = []
+    tests = []
 
-    for test in TESTS:
+    for test, result in zip(TESTS, results):
         max_points += test["points"]
-        test_file = test["file"]
-        test_name = test["name"]
         points = test["points"]
-        
-        print(f"运行测试: {test_name}")
-        passed = run_test(test_file)
-        
+        passed = result["exit_code"] == 0
+
         if passed:
             total_points += points
             status = "通过"
         else:
             status = "失败"
-        
-        results.append({
-            "name": test_name,
+
+        tests.append({
+            "name": test["name"],
             "status": status,
             "points": points if passed else 0,
-            "max_points": points
+            "max_points": points,
+            "duration": result["duration"],
+            "peak_rss": result.get("peak_rss"),
+            "cached": result["cached"],
+            "slow": result["duration"] > SLOW_TEST_SECONDS,
+            "cases": result["cases"]
         })
-        
+
+        print(f"测试: {test['name']}{'（缓存）' if result['cached'] else ''}")
         print(f"  状态: {status}")
         print(f"  得分: {points if passed else 0}/{points}")
+        print(f"  耗时: {result['duration']:.2f}秒{'  [慢]' if tests[-1]['slow'] else ''}")
+        if not passed and not result["cached"]:
+            print(result.get("log", ""))
         print()
-    
+
     # 生成总结
     print(f"总分: {total_points}/{max_points}")
-    
+
     # 生成GitHub Actions兼容的输出
-    with open(os.environ.get('GITHUB_STEP_SUMMARY', 'score_summary.md'), 'w') as f:
+    summary = os.environ.get('GITHUB_STEP_SUMMARY', os.path.join(root, 'score_summary.md'))
+    with open(summary, 'a' if 'GITHUB_STEP_SUMMARY' in os.environ else 'w') as f:
         f.write("# 自动评分结果\n\n")
-        f.write("| 测试 | 状态 | 得分 |\n")
-        f.write("|------|------|------|\n")
-        
-        for result in results:
-            f.write(f"| {result['name']} | {result['status']} | {result['points']}/{result['max_points']} |\n")
-        
+        f.write("| 测试 | 状态 | 得分 | 耗时(秒) |\n")
+        f.write("|------|------|------|------|\n")
+
+        for t in tests:
+            f.write(f"| {t['name']} | {t['status']} | {t['points']}/{t['max_points']} "
+                    f"| {t['duration']:.2f}{' (慢)' if t['slow'] else ''} |\n")
+
         f.write(f"\n## 总分: {total_points}/{max_points}\n")
-    
+
     # 生成分数JSON文件
     score_data = {
         "score": total_points,
         "max_score": max_points,
-        "tests": results
+        "tests": tests
     }
-    
-    with open('score.json', 'w') as f:
-        json.dump(score_data, f, indent=2)
-    
+
+    with open(os.path.join(root, 'score.json'), 'w') as f:
+        json.dump(score_data, f, indent=2, ensure_ascii=False)
+
     return total_points, max_points
 
-if __name__ == "__main__":
-    # 确保工作目录是项目根目录
-    os.chdir(Path(__file__).parent.parent.parent)
-    
-    # 安装依赖
+def install_requirements(root, cache_dir=None):
+    """requirements.txt变化时才重新安装依赖；cache_dir为None时总是安装"""
+    requirements = os.path.join(root, "requirements.txt")
+    if not os.path.exists(requirements):
+        return
+    with open(requirements, 'rb') as f:
+        digest = hashlib.sha256(f.read() + sys.executable.encode()).hexdigest()
+    stamp = os.path.join(cache_dir, "requirements.sha256") if cache_dir else None
+    if stamp and os.path.exists(stamp):
+        with open(stamp) as f:
+            if f.read().strip() == digest:
+                print("依赖未变化，跳过安装")
+                return
     print("安装依赖...")
-    subprocess.run([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
-    
+    completed = subprocess.run([sys.executable, "-m", "pip", "install", "-r", requirements])
+    if completed.returncode == 0 and stamp:
+        os.makedirs(os.path.dirname(stamp), exist_ok=True)
+        with open(stamp, 'w') as f:
+            f.write(digest)
+
+def _inside(path, root):
+    path, root = os.path.realpath(path), os.path.realpath(root)
+    return os.path.commonpath([path, root]) == root
+
+def grade(roots, workers=None, cache_dir=DEFAULT_CACHE_DIR, trace_memory=True):
+    """
+    并行评分一个或多个提交目录
+
+    参数:
+        roots: 提交目录列表
+        workers: 并行进程数，默认为CPU核数
+        cache_dir: 结果缓存目录，必须位于所有提交目录之外；None时不使用缓存
+        trace_memory: 是否另外运行一次测试以测量每个用例的峰值内存
+
+    返回:
+        scores: 与roots对应的 (得分, 满分) 列表
+    """
+    if cache_dir is not None and any(_inside(cache_dir, root) for root in roots):
+        raise ValueError(f"缓存目录不能位于提交目录之内: {cache_dir}")
+    tasks = [(root, test) for root in roots for test in TESTS]
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        results = list(pool.map(
+            lambda task: run_test(*task, cache_dir=cache_dir, trace_memory=trace_memory), tasks))
+
+    scores = []
+    for k, root in enumerate(roots):
+        if len(roots) > 1:
+            print(f"\n===== {root} =====\n")
+        scores.append(calculate_score(root, results[k * len(TESTS):(k + 1) * len(TESTS)]))
+    return scores
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] in ("--worker", "--worker-memory"):
+        run_worker(sys.argv[2], sys.argv[3], trace_memory=sys.argv[1] == "--worker-memory")
+        sys.exit(0)
+
+    parser = argparse.ArgumentParser(description="自动评分")
+    parser.add_argument("roots", nargs="*", help="提交目录，默认为本仓库根目录")
+    parser.add_argument("--workers", type=int, default=None, help="并行进程数，默认为CPU核数")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help="结果缓存目录，必须位于提交目录之外")
+    parser.add_argument("--no-cache", action="store_true", help="忽略缓存，全部重新运行")
+    parser.add_argument("--skip-install", action="store_true", help="不检查和安装依赖")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="不测量峰值内存，每个测试文件只运行一次")
+    args = parser.parse_args()
+
+    # 默认评分项目根目录
+    roots = [os.path.abspath(r) for r in args.roots] or [str(Path(__file__).parent.parent.parent.resolve())]
+    cache_dir = None if args.no_cache else os.path.abspath(args.cache_dir)
+    if cache_dir is not None and any(_inside(cache_dir, root) for root in roots):
+        parser.error(f"缓存目录不能位于提交目录之内: {cache_dir}")
+
+    if not args.skip_install:
+        for root in roots:
+            install_requirements(root, cache_dir)
+
     # 运行测试并计算分数
     print("\n开始评分...\n")
-    total, maximum = calculate_score()
-    
+    scores = grade(roots, workers=args.workers, cache_dir=cache_dir,
+                   trace_memory=not args.no_memory)
+    total = sum(s for s, _ in scores)
+    maximum = sum(m for _, m in scores)
+
     # 设置GitHub Actions输出变量
     if 'GITHUB_OUTPUT' in os.environ:
         with open(os.environ['GITHUB_OUTPUT'], 'a') as f:
             f.write(f"points={total}\n")
-    
+
     # 退出代码
-    sys.exit(0 if total == maximum else 1)
\ No newline at end of file
+    sys.exit(0 if total == maximum else 1)
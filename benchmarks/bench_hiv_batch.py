@@ -0,0 +1,51 @@
+"""
+HIV模型批量拟合与逐条拟合的吞吐量对比
+
+用法:
+    python benchmarks/bench_hiv_batch.py [序列条数]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from solutions.hiv_model_solution import HIVModel, fit_hiv_batch
+
+def make_series(n_series, seed=0):
+    """生成长度不一、带1%噪声的合成病毒载量序列"""
+    rng = np.random.default_rng(seed)
+    series = []
+    for _ in range(n_series):
+        n = rng.integers(10, 40)
+        t = np.sort(rng.uniform(0, 10, n))
+        model = HIVModel(rng.uniform(5e4, 2e5), rng.uniform(1, 3),
+                         rng.uniform(1e4, 5e4), rng.uniform(0.1, 0.5))
+        series.append((t, model.viral_load(t) * (1 + 0.01 * rng.standard_normal(n))))
+    return series
+
+def main():
+    """主函数"""
+    n_series = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    series = make_series(n_series)
+
+    start = time.perf_counter()
+    table = fit_hiv_batch(series)
+    batch_time = time.perf_counter() - start
+
+    n_loop = min(n_series, 200)
+    start = time.perf_counter()
+    for t, v in series[:n_loop]:
+        HIVModel.fit(t, v)
+    loop_time = (time.perf_counter() - start) / n_loop * n_series
+
+    print(f"序列条数: {n_series}")
+    print(f"批量拟合: {n_series / batch_time:10.1f} 条/秒 (收敛比例 {table['converged'].mean():.3f})")
+    print(f"逐条拟合: {n_series / loop_time:10.1f} 条/秒 (按前{n_loop}条外推)")
+    print(f"加速比: {loop_time / batch_time:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Millikan直线拟合各求解方法的速度与精度对比
+
+用法:
+    python benchmarks/bench_millikan_stable.py [数据点数，默认1e8]
+
+精度以np.longdouble累加的离差平方和结果为参考。lstsq需要构造n×2的设计矩阵，
+点数超过LSTSQ_MAX_POINTS时只在前LSTSQ_MAX_POINTS个点上计时。
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from solutions.millikan_fit_solution import calculate_parameters
+
+LSTSQ_MAX_POINTS = 10**7
+
+def synthetic_data(n, x_min, x_max, seed=0):
+    """生成 y = 4.1e-15 x - 1.7 加噪声的合成数据"""
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(x_min, x_max, n)
+    y = 4.1e-15 * x - 1.7 + rng.normal(0, 0.01, n)
+    return x, y
+
+def main():
+    """主函数"""
+    n = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10**8
+    cases = [
+        ("Millikan范围 5e14~1.2e15 Hz", 5e14, 1.2e15),
+        ("窄频带 1e15 + [0, 1e7) Hz", 1e15, 1e15 + 1e7),
+    ]
+    solvers = [
+        ("normal", {}),
+        ("centered", {}),
+        ("centered", {'dtype': np.longdouble}),
+        ("lstsq", {}),
+    ]
+
+    for title, x_min, x_max in cases:
+        x, y = synthetic_data(n, x_min, x_max)
+        reference = calculate_parameters(x, y, dtype=np.longdouble, return_condition=True)
+        print(f"{title}，n = {n:.0e}，条件数 = {reference[-1]:.3e}")
+        print(f"{'方法':<22}{'耗时(s)':>10}{'斜率相对误差':>16}{'截距绝对误差':>16}")
+        for solver, kwargs in solvers:
+            m_points = min(n, LSTSQ_MAX_POINTS) if solver == 'lstsq' else n
+            label = solver + ("(longdouble)" if kwargs else "")
+            if m_points < n:
+                label += f"[前{m_points:.0e}点]"
+            start = time.perf_counter()
+            try:
+                m, c, *_ = calculate_parameters(x[:m_points], y[:m_points], solver=solver, **kwargs)
+            except ValueError as e:
+                print(f"{label:<22}{time.perf_counter() - start:>10.3f}  失败: {e}")
+                continue
+            elapsed = time.perf_counter() - start
+            if m_points < n:
+                m_ref, c_ref = calculate_parameters(x[:m_points], y[:m_points],
+                                                    dtype=np.longdouble)[:2]
+            else:
+                m_ref, c_ref = reference[:2]
+            print(f"{label:<22}{elapsed:>10.3f}{abs(m - m_ref) / abs(m_ref):>16.3e}"
+                  f"{abs(c - c_ref):>16.3e}")
+        print()
+        del x, y
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+"""
+数值热点的基准测试套件
+
+每个基准在一组规模（10^3 … 10^8）上计时，结果追加到JSON历史文件中；
+compare命令比较两次运行，耗时增长超过阈值的项目判定为性能回退。
+
+用法:
+    python benchmarks/bench_suite.py run [--max-size N] [--only 名称片段 ...] [--history 文件]
+    python benchmarks/bench_suite.py compare [--baseline 运行] [--current 运行] [--threshold 比例]
+    python benchmarks/bench_suite.py list
+
+运行可以用历史中的序号（负数从末尾计，默认比较-2与-1）或提交哈希前缀指定。
+耗时取多轮中最快一轮；相对增幅超过阈值且绝对差超过NOISE_FLOOR才算回退。
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from solutions.bacteria_model_solution import BacteriaModel
+from solutions.basis_cache import exponential_basis
+from solutions.data_io import read_table
+from solutions.hiv_model_solution import HIVModel
+from solutions.logistic_map_solution import (compute_bifurcation, compute_bifurcation_density,
+                                             draw_bifurcation, iterate_logistic)
+from solutions.millikan_fit_solution import calculate_parameters
+
+SIZES = [10 ** k for k in range(3, 9)]
+DEFAULT_MAX_SIZE = 10 ** 6
+DEFAULT_HISTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'history.json')
+DEFAULT_THRESHOLD = 0.10
+# 耗时差小于该值(秒)时不判定回退，避免小规模下的计时抖动
+NOISE_FLOOR = 1e-5
+# 每个规模至少计时的总时长(秒)与重复轮数
+MIN_TIME = 0.2
+REPEAT = 5
+
+def _logistic(n):
+    return lambda: iterate_logistic(3.7, 0.5, n)
+
+def _bifurcation_grid(n):
+    """规模n对应的分岔图网格：1000个r值，每个r值迭代n/1000次，丢弃前一半"""
+    n_iterations = max(n // 1000, 2)
+    return 2.5, 4.0, 1000, n_iterations, n_iterations // 2
+
+def _bifurcation_compute(n):
+    args = _bifurcation_grid(n)
+    return lambda: compute_bifurcation(*args)
+
+def _render(**data):
+    """用plot_bifurcation的绘制代码draw_bifurcation绘制预先算好的数据并做Agg栅格化"""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    def render():
+        fig = Figure(figsize=(12, 8))
+        canvas = FigureCanvasAgg(fig)
+        draw_bifurcation(fig.add_subplot(), **data)
+        canvas.draw()
+    return render
+
+def _bifurcation_render(n):
+    """逐点模式：只计时绘制，轨道点预先算好"""
+    r, x = compute_bifurcation(*_bifurcation_grid(n))
+    return _render(r=r, x=x)
+
+def _bifurcation_render_density(n):
+    """密度模式：只计时绘制，计数栅格预先算好"""
+    r, x_edges, counts = compute_bifurcation_density(*_bifurcation_grid(n))
+    return _render(counts=counts, extent=(r[0], r[-1], x_edges[0], x_edges[-1]))
+
+def _millikan(n):
+    rng = np.random.default_rng(0)
+    x = np.linspace(5e14, 1.2e15, n)
+    y = 4.1e-15 * x - 2.0 + 0.05 * rng.standard_normal(n)
+    return lambda: calculate_parameters(x, y)
+
+def _model(make, method, cold):
+    """
+    模型求值基准。模型求值经过指数基函数缓存：warm计时命中缓存后的组合，
+    cold在每次调用前清空缓存，计时exp求值本身。每个规模前后清空缓存。
+    """
+    def setup(n):
+        exponential_basis.clear()
+        evaluate = getattr(make(), method)
+        t = np.linspace(0, 10, n)
+        if cold:
+            def func():
+                exponential_basis.clear()
+                evaluate(t)
+        else:
+            def func():
+                evaluate(t)
+        return func, exponential_basis.clear
+    return setup
+
+def _hiv_model():
+    return HIVModel(A=1.5e5, alpha=2.0, B=3e4, beta=0.3)
+
+def _bacteria_model():
+    return BacteriaModel(A=1.0, tau=2.0)
+
+def _text_file(n):
+    """写入n行两列的文本数据，返回路径"""
+    fd, path = tempfile.mkstemp(suffix='.txt')
+    rng = np.random.default_rng(0)
+    data = np.column_stack([np.linspace(0, 1, n), rng.standard_normal(n)])
+    with os.fdopen(fd, 'w') as f:
+        f.write("x,y\n")
+        np.savetxt(f, data, delimiter=',', fmt='%.10g')
+    return path
+
+def _read_text(n):
+    path = _text_file(n)
+    return lambda: read_table(path, cache=False), lambda: os.remove(path)
+
+def _read_cached(n):
+    path = _text_file(n)
+    read_table(path)
+    cache = path + '.cache.npz'
+
+    def cleanup():
+        for p in (path, cache):
+            if os.path.exists(p):
+                os.remove(p)
+    return lambda: read_table(path), cleanup
+
+# 名称 -> (准备函数, 最大规模, 回退阈值)。准备函数接收规模n，返回被计时的
+# 无参函数，或 (被计时函数, 清理函数)
+BENCHMARKS = {
+    'logistic.iterate': (_logistic, 10 ** 8, DEFAULT_THRESHOLD),
+    'logistic.bifurcation_compute': (_bifurcation_compute, 10 ** 8, DEFAULT_THRESHOLD),
+    'logistic.bifurcation_render': (_bifurcation_render, 10 ** 7, 0.25),
+    'logistic.bifurcation_render_density': (_bifurcation_render_density, 10 ** 8, 0.25),
+    'millikan.calculate_parameters': (_millikan, 10 ** 8, DEFAULT_THRESHOLD),
+    'hiv.viral_load': (_model(_hiv_model, 'viral_load', False), 10 ** 8, DEFAULT_THRESHOLD),
+    'hiv.viral_load_cold': (_model(_hiv_model, 'viral_load', True), 10 ** 8, DEFAULT_THRESHOLD),
+    'bacteria.v_model': (_model(_bacteria_model, 'v_model', False), 10 ** 8, DEFAULT_THRESHOLD),
+    'bacteria.v_model_cold': (_model(_bacteria_model, 'v_model', True), 10 ** 8,
+                              DEFAULT_THRESHOLD),
+    'bacteria.w_model': (_model(_bacteria_model, 'w_model', False), 10 ** 8, DEFAULT_THRESHOLD),
+    'bacteria.w_model_cold': (_model(_bacteria_model, 'w_model', True), 10 ** 8,
+                              DEFAULT_THRESHOLD),
+    'data_io.read_text': (_read_text, 10 ** 7, 0.15),
+    'data_io.read_cached': (_read_cached, 10 ** 7, 0.15),
+}
+
+def time_call(func, min_time=MIN_TIME, repeat=REPEAT):
+    """
+    测量func单次调用的耗时
+
+    先确定每轮调用次数使一轮不短于min_time/repeat，再取repeat轮中最快的一轮。
+
+    返回:
+        best: 最快一轮的单次耗时(秒)
+        median: 各轮单次耗时的中位数(秒)
+    """
+    start = time.perf_counter()
+    func()
+    first = time.perf_counter() - start
+    number = max(1, int(min_time / repeat / max(first, 1e-9)))
+    rounds = []
+    for _ in range(repeat if first < min_time else 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        rounds.append((time.perf_counter() - start) / number)
+    return min(rounds), float(np.median(rounds))
+
+def _git_commit():
+    try:
+        completed = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                   capture_output=True, text=True, check=True)
+        return completed.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+def run(names, max_size, history_path):
+    """运行选中的基准并把结果追加到历史文件"""
+    results = {}
+    for name in names:
+        setup, limit, _ = BENCHMARKS[name]
+        results[name] = {}
+        for n in SIZES:
+            if n > min(limit, max_size):
+                break
+            prepared = setup(n)
+            func, cleanup = prepared if isinstance(prepared, tuple) else (prepared, None)
+            try:
+                best, median = time_call(func)
+            finally:
+                if cleanup is not None:
+                    cleanup()
+            results[name][str(n)] = {'best': best, 'median': median}
+            print(f"{name:32s} n={n:<10d} {best * 1e3:12.3f} ms  ({n / best:12.4g} /秒)")
+
+    entry = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'machine': platform.node(),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'results': results,
+    }
+    history = load_history(history_path)
+    history.append(entry)
+    tmp = history_path + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(history, f, indent=1)
+    os.replace(tmp, history_path)
+    print(f"结果已追加到 {history_path}（第{len(history) - 1}次运行）")
+
+def _select_run(history, ref):
+    """按序号或提交哈希前缀选择一次运行"""
+    try:
+        return history[int(ref)]
+    except ValueError:
+        pass
+    except IndexError:
+        raise ValueError(f"历史中没有第{ref}次运行")
+    for entry in reversed(history):
+        if entry.get('commit') and entry['commit'].startswith(ref):
+            return entry
+    raise ValueError(f"历史中没有提交 {ref} 的运行")
+
+def compare(history_path, baseline='-2', current='-1', threshold=None):
+    """
+    比较两次运行
+
+    参数:
+        history_path: 历史文件
+        baseline, current: 运行的序号或提交哈希前缀
+        threshold: 回退阈值（相对增幅），None时使用各基准自己的阈值
+
+    返回:
+        regressions: 回退项目数
+    """
+    history = load_history(history_path)
+    if len(history) < 2:
+        raise ValueError("历史中至少需要两次运行才能比较")
+    base = _select_run(history, baseline)
+    cur = _select_run(history, current)
+    print(f"基准: {base['commit']} {base['timestamp']}")
+    print(f"当前: {cur['commit']} {cur['timestamp']}")
+    print(f"{'基准测试':32s} {'规模':>10s} {'基准(ms)':>12s} {'当前(ms)':>12s} {'比值':>8s}")
+
+    regressions = 0
+    for name, sizes in cur['results'].items():
+        limit = threshold if threshold is not None else BENCHMARKS.get(
+            name, (None, None, DEFAULT_THRESHOLD))[2]
+        for n, timing in sizes.items():
+            old = base['results'].get(name, {}).get(n)
+            if old is None:
+                continue
+            ratio = timing['best'] / old['best']
+            flag = ''
+            if abs(timing['best'] - old['best']) < NOISE_FLOOR:
+                pass
+            elif ratio > 1 + limit:
+                flag = '  回退'
+                regressions += 1
+            elif ratio < 1 / (1 + limit):
+                flag = '  提升'
+            print(f"{name:32s} {n:>10s} {old['best'] * 1e3:12.3f} "
+                  f"{timing['best'] * 1e3:12.3f} {ratio:8.3f}{flag}")
+    print(f"回退项目数: {regressions}")
+    return regressions
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="数值热点基准测试")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="运行基准并记录结果")
+    run_parser.add_argument('--max-size', type=float, default=DEFAULT_MAX_SIZE,
+                            help="最大规模，默认10^6；完整阶梯用1e8")
+    run_parser.add_argument('--only', nargs='+', default=None, help="只运行名称含这些片段的基准")
+    run_parser.add_argument('--history', default=DEFAULT_HISTORY)
+
+    compare_parser = commands.add_parser('compare', help="比较两次运行")
+    compare_parser.add_argument('--baseline', default='-2')
+    compare_parser.add_argument('--current', default='-1')
+    compare_parser.add_argument('--threshold', type=float, default=None)
+    compare_parser.add_argument('--history', default=DEFAULT_HISTORY)
+
+    commands.add_parser('list', help="列出基准")
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        for name, (_, limit, threshold) in BENCHMARKS.items():
+            print(f"{name:32s} 最大规模 {limit:.0e}  阈值 {threshold:.0%}")
+    elif args.command == 'run':
+        names = [name for name in BENCHMARKS
+                 if args.only is None or any(part in name for part in args.only)]
+        if not names:
+            parser.error("没有匹配的基准")
+        run(names, int(args.max_size), args.history)
+    else:
+        try:
+            regressions = compare(args.history, args.baseline, args.current, args.threshold)
+        except ValueError as e:
+            parser.error(str(e))
+        sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
@@ -1,53 +1,339 @@
 import numpy as np
-import matplotlib.pyplot as plt
+
+from solutions.basis_cache import exponential_basis
+from solutions.data_io import load_columns
+from solutions.least_squares import (levenberg_marquardt, levenberg_marquardt_batch, pad_series,
+                                     variable_projection)
+from solutions.plotting import pyplot, show
 
 class BacteriaModel:
     def __init__(self, A, tau):
         self.A = A
         self.tau = tau
 
+    def _expand(self, t):
+        """把参数扩展出时间维度，返回 (A, tau, exp(-t/tau))"""
+        t = np.asarray(t, dtype=float)
+        expand = (Ellipsis,) + (np.newaxis,) * t.ndim
+        tau = np.asarray(self.tau, dtype=float)
+        return (np.asarray(self.A, dtype=float)[expand], tau[expand],
+                exponential_basis(1 / tau, t))
+
     def v_model(self, t):
-        return 1 - np.exp(-t/self.tau)
+        """
+        V(t) = 1 - e^{-t/tau}
+
+        tau可以是数组，结果形状为 tau.shape + t.shape。
+        """
+        _, _, e = self._expand(t)
+        return 1 - e
 
     def w_model(self, t):
-        return self.A * (np.exp(-t/self.tau) - 1 + t/self.tau)
+        """
+        W(t) = A (e^{-t/tau} - 1 + t/tau)
+
+        A、tau可以是数组，广播后与时间网格做外积，结果形状为 参数形状 + t.shape。
+        """
+        A, tau, e = self._expand(t)
+        return A * (e - 1 + np.asarray(t, dtype=float) / tau)
+
+    @classmethod
+    def fit_v(cls, t, y, max_iter=200, tol=1e-10):
+        """
+        拟合V(t) = 1 - e^{-t/tau}
+
+        tau的初值由 ln(1 - V) = -t/tau 过原点的线性拟合闭式给出，
+        再用Levenberg-Marquardt方法细化。
+
+        参数:
+            t, y: 时间和响应数组
+            max_iter: 最大迭代次数
+            tol: 参数相对变化的收敛容差
+
+        返回:
+            params: 拟合参数数组(tau,)
+            covariance: 参数的1×1协方差矩阵
+        """
+        t, y = _as_series(t, y, 2)
+        tau0 = _v_tau_seed(t, y, np.ones(len(t), dtype=bool))
+        return levenberg_marquardt(lambda p: _v_residual_and_jacobian(p, t, y),
+                                   [tau0], max_iter=max_iter, tol=tol)
+
+    @classmethod
+    def fit_w(cls, t, y, max_iter=200, tol=1e-10, method='lm'):
+        """
+        拟合W(t) = A (e^{-t/tau} - 1 + t/tau)
+
+        在对数tau网格上闭式求解A并取残差最小的节点作为初值。method='lm'时
+        用Levenberg-Marquardt方法同时细化(A, tau)；method='varpro'时用变量
+        投影法只在log tau上迭代，A每步闭式求解。
+
+        参数:
+            t, y: 时间和响应数组
+            max_iter: 最大迭代次数
+            tol: 参数相对变化的收敛容差
+            method: 'lm'或'varpro'
+
+        返回:
+            params: 拟合参数数组(A, tau)
+            covariance: 参数的2×2协方差矩阵
+        """
+        t, y = _as_series(t, y, 3)
+        p0 = _w_seed(t, y, np.ones(len(t), dtype=bool))
+        if method == 'varpro':
+            (log_tau,), (A,) = variable_projection(
+                lambda theta: _w_basis(t, theta), np.log(p0[1:]), y,
+                max_iter=max_iter, tol=tol)
+            params = np.array([A, np.exp(log_tau)])
+            # 在原始参数(A, tau)下计算完整雅可比矩阵，得到协方差
+            residual, J = _w_residual_and_jacobian(params, t, y)
+            dof = max(len(t) - 2, 1)
+            return params, np.linalg.pinv(J.T @ J) * (residual @ residual / dof)
+        if method != 'lm':
+            raise ValueError(f"未知的拟合方法: {method}")
+        return levenberg_marquardt(lambda p: _w_residual_and_jacobian(p, t, y),
+                                   p0, max_iter=max_iter, tol=tol)
+
+    @classmethod
+    def fit_joint(cls, t_v, y_v, t_w, y_w, max_iter=200, tol=1e-10):
+        """
+        用共同的tau同时拟合V(t)和W(t)两组数据
+
+        两组残差等权拼接；tau初值取V数据的闭式估计，A在该tau下闭式求解。
+
+        参数:
+            t_v, y_v: V(t)数据
+            t_w, y_w: W(t)数据
+            max_iter: 最大迭代次数
+            tol: 参数相对变化的收敛容差
+
+        返回:
+            params: 拟合参数数组(A, tau)
+            covariance: 参数的2×2协方差矩阵
+        """
+        t_v, y_v = _as_series(t_v, y_v, 1)
+        t_w, y_w = _as_series(t_w, y_w, 1)
+        if len(t_v) + len(t_w) < 3:
+            raise ValueError("两组数据合计至少需要3个数据点")
+        tau0 = _v_tau_seed(t_v, y_v, np.ones(len(t_v), dtype=bool))
+        g = np.exp(-t_w / tau0) - 1 + t_w / tau0
+        A0 = (g @ y_w) / (g @ g)
+
+        def residual_and_jacobian(p):
+            r_v, J_v = _v_residual_and_jacobian(p[1:], t_v, y_v)
+            r_w, J_w = _w_residual_and_jacobian(p, t_w, y_w)
+            J_v = np.concatenate([np.zeros_like(J_v), J_v], axis=-1)
+            return np.concatenate([r_v, r_w]), np.concatenate([J_v, J_w])
+
+        return levenberg_marquardt(residual_and_jacobian, [A0, tau0],
+                                   max_iter=max_iter, tol=tol)
+
+    @classmethod
+    def fit_batch(cls, series, model='v', max_iter=200, tol=1e-10):
+        """批量拟合多条实验曲线，见fit_bacteria_batch"""
+        return fit_bacteria_batch(series, model, max_iter, tol)
 
     def plot_models(self, t):
         v = self.v_model(t)
         w = self.w_model(t)
         
+        plt = pyplot()
         plt.plot(t, v, label='V(t)')
         plt.plot(t, w, label='W(t)')
         plt.xlabel('Time')
         plt.ylabel('Response')
         plt.title('Bacteria Growth Models')
         plt.legend()
-        plt.show()
+        show()
+
+def _as_series(t, y, min_points):
+    """转换为浮点数组并检查长度"""
+    t = np.asarray(t, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if t.shape != y.shape:
+        raise ValueError("时间和响应数组长度必须相同")
+    if len(t) < min_points:
+        raise ValueError(f"至少需要{min_points}个数据点")
+    return t, y
+
+def _v_residual_and_jacobian(p, t, y):
+    """V(t)模型的残差和对tau的雅可比矩阵；p的最后一维为(tau,)，与t按行广播"""
+    tau = p[..., 0, np.newaxis]
+    e = np.exp(-t / tau)
+    return 1 - e - y, (-t / tau ** 2 * e)[..., np.newaxis]
+
+def _w_residual_and_jacobian(p, t, y):
+    """W(t)模型的残差和对(A, tau)的雅可比矩阵；p的最后一维为(A, tau)"""
+    A = p[..., 0, np.newaxis]
+    tau = p[..., 1, np.newaxis]
+    e = np.exp(-t / tau)
+    g = e - 1 + t / tau
+    return A * g - y, np.stack([g, A * t / tau ** 2 * (e - 1)], axis=-1)
+
+def _w_basis(t, log_tau):
+    """W(t)的基函数 e^{-t/tau} - 1 + t/tau 及其对 log tau 的导数，供变量投影法使用"""
+    tau = np.exp(log_tau[0])
+    e = np.exp(-t / tau)
+    Phi = (e - 1 + t / tau)[:, np.newaxis]
+    dPhi = (t / tau * (e - 1))[np.newaxis, :, np.newaxis]
+    return Phi, dPhi
+
+def _v_tau_seed(t, v, mask):
+    """
+    ln(1 - V) = -t/tau 过原点的线性拟合给出的tau初值
+
+    只使用掩码内 0 < V < 1 的点，沿最后一维批量计算；没有可用点时为nan。
+    """
+    valid = mask & (v > 0) & (v < 1)
+    log_rest = np.log(np.where(valid, 1 - v, 1.0))
+    num = -(t * log_rest * valid).sum(axis=-1)
+    den = (t * t * valid).sum(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where((num > 0) & (den > 0), den / num, np.nan)
+
+def _w_seed(t, w, mask, n_grid=64):
+    """
+    W(t)模型的初值(A, tau)
+
+    在 [T/100, 10T] 的对数tau网格上闭式求解A，取残差最小的节点（T为最大时间），
+    沿最后一维批量计算。
+    """
+    span = np.max(np.where(mask, t, 0.0), axis=-1)
+    taus = np.geomspace(0.01, 10, n_grid) * span[..., np.newaxis]
+    tt = t[..., np.newaxis, :]
+    g = (np.exp(-tt / taus[..., np.newaxis]) - 1 + tt / taus[..., np.newaxis])
+    g = g * mask[..., np.newaxis, :]
+    gy = (g * w[..., np.newaxis, :]).sum(axis=-1)
+    gg = (g * g).sum(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gain = np.where(gg > 0, gy ** 2 / gg, -np.inf)
+    best = np.argmax(gain, axis=-1)[..., np.newaxis]
+    tau = np.take_along_axis(taus, best, axis=-1)[..., 0]
+    A = np.take_along_axis(gy / gg, best, axis=-1)[..., 0]
+    return np.stack([A, tau], axis=-1)
+
+# fit_bacteria_batch返回的参数表字段
+BACTERIA_FIT_DTYPE = np.dtype([
+    ('A', 'f8'), ('tau', 'f8'), ('A_err', 'f8'), ('tau_err', 'f8'),
+    ('cost', 'f8'), ('n_points', 'i8'), ('converged', '?'),
+])
+
+def fit_bacteria_batch(series, model='v', max_iter=200, tol=1e-10):
+    """
+    批量拟合多条细菌实验曲线
+
+    所有曲线填充为矩形数组并用掩码屏蔽填充位置，初值批量闭式估计，
+    再用levenberg_marquardt_batch同时迭代。数据点数不多于参数个数的曲线
+    不参与迭代，参数为nan，converged为False，其余曲线照常拟合。
+
+    参数:
+        series: (t, y)数组对的序列
+        model: 'v'拟合V(t)（只有tau，A记为nan），'w'拟合W(t)
+        max_iter: 最大迭代次数
+        tol: 参数相对变化的收敛容差
+
+    返回:
+        table: BACTERIA_FIT_DTYPE结构化数组，每条曲线一行
+    """
+    if model not in ('v', 'w'):
+        raise ValueError(f"未知的模型: {model}")
+    t, y, n_points = pad_series(series)
+    n_params = 1 if model == 'v' else 2
+    if t.shape[1] == 0:
+        # 没有曲线或所有曲线都为空，无从估计初值
+        table = np.zeros(len(series), dtype=BACTERIA_FIT_DTYPE)
+        for name in BACTERIA_FIT_DTYPE.names:
+            if BACTERIA_FIT_DTYPE[name].kind == 'f':
+                table[name] = np.nan
+        table['n_points'] = n_points
+        return table
+    mask = np.arange(t.shape[1]) < n_points[:, np.newaxis]
+    step = _v_residual_and_jacobian if model == 'v' else _w_residual_and_jacobian
+
+    def residual_and_jacobian(p, rows):
+        r, J = step(p, t[rows], y[rows])
+        m = mask[rows]
+        return np.where(m, r, 0.0), J * m[..., np.newaxis]
+
+    # 点数不足的曲线可能给出0/0，其初值随后被替换为nan
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if model == 'v':
+            p0 = _v_tau_seed(t, y, mask)[:, np.newaxis]
+        else:
+            p0 = _w_seed(t, y, mask)
+    p0[n_points <= n_params] = np.nan
+    p, covariance, cost, converged = levenberg_marquardt_batch(
+        residual_and_jacobian, p0, n_points, max_iter=max_iter, tol=tol)
+    errors = np.sqrt(np.abs(np.einsum('nii->ni', covariance)))
+
+    table = np.zeros(len(series), dtype=BACTERIA_FIT_DTYPE)
+    if model == 'v':
+        table['A'] = table['A_err'] = np.nan
+        table['tau'], table['tau_err'] = p[:, 0], errors[:, 0]
+    else:
+        table['A'], table['tau'] = p[:, 0], p[:, 1]
+        table['A_err'], table['tau_err'] = errors[:, 0], errors[:, 1]
+    table['cost'] = cost
+    table['n_points'] = n_points
+    table['converged'] = converged
+    return table
+
+def fit_tau_batch(t, v, max_iter=200, tol=1e-10):
+    """
+    批量拟合等长数据上V(t) = 1 - exp(-t/tau)中的时间常数tau
+
+    参数:
+        t, v: 形状为(..., n)的时间和响应数组，沿最后一维拟合
+        max_iter: 最大迭代次数
+        tol: 参数相对变化的收敛容差
+
+    返回:
+        tau: 形状为(...)的时间常数数组，无法拟合的为nan
+    """
+    t, v = np.broadcast_arrays(np.asarray(t, dtype=float), np.asarray(v, dtype=float))
+    shape = t.shape[:-1]
+    t = t.reshape(-1, t.shape[-1])
+    v = v.reshape(-1, v.shape[-1])
+    mask = np.ones(t.shape, dtype=bool)
+    p, _, _, _ = levenberg_marquardt_batch(
+        lambda p, rows: _v_residual_and_jacobian(p, t[rows], v[rows]),
+        _v_tau_seed(t, v, mask)[:, np.newaxis], np.full(len(t), t.shape[-1]),
+        max_iter=max_iter, tol=tol)
+    return p[:, 0].reshape(shape)
 
 def load_bacteria_data(filepath):
-    try:
-        data = np.loadtxt(filepath,delimiter=',')
-        return data['time'], data['response']
-    except:
-        return np.loadtxt(filepath, delimiter=',', unpack=True)
+    """读取(时间, 响应)两列数据，格式探测与缓存见solutions.data_io"""
+    return load_columns(filepath)
 
 def main():
-    # 初始化模型参数
-    model = BacteriaModel(A=1.0, tau=2.0)
-    
-    # 生成时间序列
-    t = np.linspace(0, 10, 100)
-    
-    # 绘制模型曲线
-    model.plot_models(t)
-    
-    # 加载实验数据
-    time_data, response_data = load_bacteria_data('data/g149novickA.txt')
-    
-    # 绘制实验数据
-    plt.scatter(time_data, response_data, label='Experimental Data')
+    # 加载实验数据：A组为V(t)，B组只保留十小时以内的数据用于W(t)
+    t_v, y_v = load_bacteria_data('data/g149novickA.txt')
+    t_w, y_w = load_bacteria_data('data/g149novickB.txt')
+    keep = t_w <= 10
+    t_w, y_w = t_w[keep], y_w[keep]
+
+    # 分别拟合以及共享tau的联合拟合
+    (tau_v,), cov_v = BacteriaModel.fit_v(t_v, y_v)
+    (A_w, tau_w), cov_w = BacteriaModel.fit_w(t_w, y_w)
+    (A_j, tau_j), cov_j = BacteriaModel.fit_joint(t_v, y_v, t_w, y_w)
+    print(f"V(t)拟合: tau = {tau_v:.4f} ± {np.sqrt(cov_v[0, 0]):.4f}")
+    print(f"W(t)拟合: A = {A_w:.4f} ± {np.sqrt(cov_w[0, 0]):.4f}, "
+          f"tau = {tau_w:.4f} ± {np.sqrt(cov_w[1, 1]):.4f}")
+    print(f"联合拟合: A = {A_j:.4f} ± {np.sqrt(cov_j[0, 0]):.4f}, "
+          f"tau = {tau_j:.4f} ± {np.sqrt(cov_j[1, 1]):.4f}")
+
+    # 绘制实验数据和拟合曲线
+    t = np.linspace(0, max(t_v.max(), t_w.max()), 200)
+    plt = pyplot()
+    plt.scatter(t_v, y_v, label='Experimental Data (A)')
+    plt.scatter(t_w, y_w, label='Experimental Data (B)')
+    plt.plot(t, BacteriaModel(A=A_w, tau=tau_v).v_model(t), label='V(t) fit')
+    plt.plot(t, BacteriaModel(A=A_w, tau=tau_w).w_model(t), label='W(t) fit')
+    plt.xlabel('Time')
+    plt.ylabel('Response')
+    plt.title('Bacteria Growth Models')
     plt.legend()
-    plt.show()
+    show()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,116 @@
+"""
+指数基函数 exp(-k t) 的LRU缓存（解决方案）
+
+参数扫描中同一组速率或同一时间网格会被反复求值。缓存以
+(速率, 时间网格哈希) 为键保存 exp(-k t) 的结果，命中时不再重复计算超越函数。
+缓存只对小网格有利：大网格上哈希和拼接的开销与直接求值相当，且条目占用
+大量内存，因此超过max_grid_size个点的网格不经过缓存直接计算。
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+class ExponentialBasisCache:
+    """
+    exp(-k t) 基函数的LRU缓存
+
+    每个条目是一个速率在一个时间网格上的取值，返回的数组为只读。
+    条目数不超过maxsize，总字节数不超过maxbytes。
+    """
+
+    def __init__(self, maxsize=256, maxbytes=32 << 20, max_grid_size=1 << 16):
+        """
+        参数:
+            maxsize: 最大条目数
+            maxbytes: 所有条目的最大总字节数
+            max_grid_size: 参与缓存的时间网格最大点数，更大的网格直接计算
+        """
+        if maxsize < 1 or maxbytes < 1:
+            raise ValueError("缓存大小必须为正整数")
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.max_grid_size = max_grid_size
+        self._entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def grid_key(time):
+        """时间网格的哈希键，由形状和数据内容决定（进程内有效）"""
+        return time.shape, hash(time.tobytes())
+
+    def __call__(self, rates, time):
+        """
+        计算 exp(-rates * time)，结果形状为 rates.shape + time.shape
+
+        参数:
+            rates: 速率，标量或数组
+            time: 时间网格
+
+        返回:
+            basis: 指数基函数数组；rates为标量时是缓存中的只读数组
+        """
+        time = np.asarray(time, dtype=float)
+        rates = np.asarray(rates, dtype=float)
+        if time.size > self.max_grid_size or time.nbytes > self.maxbytes:
+            basis = np.multiply.outer(-rates, time)
+            return np.exp(basis, out=basis)
+        grid = self.grid_key(time)
+        if rates.ndim == 0:
+            key = (float(rates), grid)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry
+        unique, inverse = np.unique(rates, return_inverse=True)
+
+        rows = [None] * len(unique)
+        missing = []
+        for i, rate in enumerate(unique.tolist()):
+            entry = self._entries.get((rate, grid))
+            if entry is None:
+                missing.append(i)
+            else:
+                self._entries.move_to_end((rate, grid))
+                rows[i] = entry
+        self.hits += len(unique) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            values = np.multiply.outer(-unique[missing], time)
+            np.exp(values, out=values)
+            values.flags.writeable = False
+            for i, value in zip(missing, values):
+                rows[i] = value
+            # 只保存不会被立即淘汰的行；保存副本而不是values的视图，
+            # 否则任一存活的行都会让整批结果留在内存中，nbytes与实际占用不符
+            n_keep = min(len(missing), self.maxsize, self.maxbytes // max(values[0].nbytes, 1))
+            for i, value in zip(missing[len(missing) - n_keep:], values[len(missing) - n_keep:]):
+                value = np.array(value)
+                value.flags.writeable = False
+                self._entries[(float(unique[i]), grid)] = value
+                self.nbytes += value.nbytes
+            while len(self._entries) > self.maxsize or self.nbytes > self.maxbytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+
+        if rates.ndim == 0:
+            return rows[0]
+        return np.stack(rows)[inverse.reshape(rates.shape)].reshape(rates.shape + time.shape)
+
+    def cache_info(self):
+        """返回 (命中次数, 未命中次数, 当前条目数, 最大条目数)"""
+        return self.hits, self.misses, len(self._entries), self.maxsize
+
+    def clear(self):
+        """清空缓存和统计"""
+        self._entries.clear()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+# 模型求值共用的默认缓存
+exponential_basis = ExponentialBasisCache()
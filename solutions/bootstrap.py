@@ -0,0 +1,140 @@
+"""
+拟合参数的自助法(bootstrap)与刀切法(jackknife)置信区间（解决方案）
+
+重抽样的拟合以批为单位向量化执行：拟合函数接收形状为(n_batch, n)的数据，
+返回形状为(n_batch, n_params)的参数。批可以分配到进程池中并行计算，
+每批的随机数种子由SeedSequence按批序号派生，结果与进程数无关。
+"""
+
+import numpy as np
+
+from solutions.bacteria_model_solution import fit_tau_batch
+from solutions.hiv_model_solution import fit_hiv_batch
+
+DEFAULT_BATCH_SIZE = 1000
+
+def linear_fit_batch(x, y):
+    """
+    批量计算直线 y = m x + c 的最小二乘拟合
+
+    参数:
+        x, y: 形状为(..., n)的数组，沿最后一维拟合
+
+    返回:
+        params: 形状为(..., 2)的数组，最后一维为(m, c)；x全部相同的行为nan
+    """
+    x_mean = x.mean(axis=-1, keepdims=True)
+    y_mean = y.mean(axis=-1, keepdims=True)
+    dx = x - x_mean
+    sxx = (dx * dx).sum(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        m = np.where(sxx > 0, (dx * (y - y_mean)).sum(axis=-1) / sxx, np.nan)
+    c = y_mean[..., 0] - m * x_mean[..., 0]
+    return np.stack([m, c], axis=-1)
+
+def _bootstrap_batch(fit_batch, x, y, size, seed, fitted, residuals):
+    """
+    计算一批自助样本的拟合参数
+
+    fitted为None时按样本点(cases)重抽样，否则对残差重抽样并加到拟合值上。
+    """
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, len(y), size=(size, len(y)))
+    if fitted is None:
+        return fit_batch(x[idx], y[idx])
+    x_batch = np.broadcast_to(x, (size, len(x)))
+    return fit_batch(x_batch, fitted + residuals[idx])
+
+def bootstrap(fit_batch, x, y, n_boot=1000, method='cases', predict=None,
+              confidence=0.95, seed=None, batch_size=DEFAULT_BATCH_SIZE, workers=None):
+    """
+    自助法估计拟合参数的置信区间
+
+    参数:
+        fit_batch: 批量拟合函数 (X, Y) -> params，X、Y形状为(n_batch, n)，
+                   params形状为(n_batch, n_params)；多进程时须可被pickle
+        x, y: 原始数据
+        n_boot: 自助样本数
+        method: 'cases'对样本点重抽样，'residuals'对残差重抽样
+        predict: 残差重抽样时的预测函数 (params, x) -> y_fit
+        confidence: 置信水平
+        seed: 随机数种子
+        batch_size: 每批的自助样本数
+        workers: 进程数，None表示单进程
+
+    返回:
+        estimate: 原始数据的拟合参数
+        interval: 形状为(2, n_params)的百分位置信区间（下界, 上界）
+        samples: 形状为(n_boot, n_params)的自助样本参数；退化的重抽样（如x全部
+                 相同）由fit_batch返回nan，计算置信区间时忽略
+    """
+    if method not in ('cases', 'residuals'):
+        raise ValueError(f"未知的重抽样方法: {method}")
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    estimate = fit_batch(x[np.newaxis], y[np.newaxis])[0]
+
+    fitted = residuals = None
+    if method == 'residuals':
+        if predict is None:
+            raise ValueError("残差重抽样需要提供predict函数")
+        fitted = predict(estimate, x)
+        residuals = y - fitted
+
+    sizes = [min(batch_size, n_boot - start) for start in range(0, n_boot, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [(fit_batch, x, y, size, s, fitted, residuals) for size, s in zip(sizes, seeds)]
+    if workers is None or workers <= 1:
+        results = [_bootstrap_batch(*a) for a in args]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_bootstrap_batch, *zip(*args)))
+    samples = np.concatenate(results, axis=0)
+
+    alpha = (1 - confidence) / 2
+    interval = np.nanpercentile(samples, [100 * alpha, 100 * (1 - alpha)], axis=0)
+    return estimate, interval, samples
+
+def jackknife(fit_batch, x, y):
+    """
+    刀切法估计拟合参数的标准误差和偏差
+
+    所有留一样本组成形状为(n, n-1)的数组，一次批量拟合。
+
+    参数:
+        fit_batch: 批量拟合函数，约定同bootstrap
+        x, y: 原始数据
+
+    返回:
+        estimate: 原始数据的拟合参数
+        std_error: 刀切法标准误差
+        bias: 刀切法偏差估计
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n < 3:
+        raise ValueError("刀切法至少需要3个数据点")
+    estimate = fit_batch(x[np.newaxis], y[np.newaxis])[0]
+
+    # 第i行为去掉第i个点后的下标
+    idx = np.arange(1, n) - np.tri(n, n - 1, k=-1, dtype=int)
+    samples = fit_batch(x[idx], y[idx])
+    mean = samples.mean(axis=0)
+    std_error = np.sqrt((n - 1) / n * ((samples - mean) ** 2).sum(axis=0))
+    bias = (n - 1) * (mean - estimate)
+    return estimate, std_error, bias
+
+def tau_fit_batch(t, v):
+    """BacteriaModel中tau的批量拟合，返回形状为(n_batch, 1)的参数"""
+    return fit_tau_batch(t, v)[..., np.newaxis]
+
+def hiv_fit_batch(t, load):
+    """
+    HIV双指数模型的批量拟合，返回形状为(n_batch, 4)的(A, alpha, B, beta)
+
+    fit_hiv_batch已按速率排序两项（alpha >= beta），不同样本间快慢项不会对调。
+    """
+    table = fit_hiv_batch(list(zip(t, load)))
+    return np.stack([table[name] for name in ('A', 'alpha', 'B', 'beta')], axis=-1)
@@ -0,0 +1,167 @@
+"""
+数据文件的统一读取（解决方案）
+
+文本数据先探测分隔符（逗号、制表符或空白）和表头，再分块解析。解析结果
+缓存为同目录下的 <文件名>.cache.npz，其中记录源文件的修改时间和大小，
+源文件变化后缓存自动失效。.npy/.npz文件直接读取。
+"""
+
+import os
+import warnings
+import zipfile
+
+import numpy as np
+
+DEFAULT_CHUNK_ROWS = 1_000_000
+CACHE_SUFFIX = '.cache.npz'
+_SNIFF_LINES = 50
+
+def _is_number(token):
+    try:
+        float(token)
+    except ValueError:
+        return False
+    return True
+
+def sniff_format(path):
+    """
+    探测文本数据文件的格式
+
+    只读取文件开头的若干行：跳过以#开头的注释行，第一行数据中含逗号则以逗号
+    分隔，含制表符则以制表符分隔，否则按空白分隔；数据之前不能解析为数字的行
+    视为表头，最后一个表头行给出列名。
+
+    参数:
+        path: 文件路径
+
+    返回:
+        delimiter: 分隔符，按空白分隔时为None
+        skiprows: 数据之前需要跳过的行数
+        columns: 列名列表，没有表头时为None
+    """
+    skiprows = 0
+    header = None
+    with open(path) as f:
+        for _, line in zip(range(_SNIFF_LINES), f):
+            stripped = line.strip()
+            if not stripped or stripped.startswith('#'):
+                skiprows += 1
+                continue
+            delimiter = ',' if ',' in stripped else '\t' if '\t' in stripped else None
+            tokens = [t.strip() for t in stripped.split(delimiter)]
+            if all(_is_number(t) for t in tokens if t):
+                return delimiter, skiprows, header
+            header = [t.strip('"\'') for t in tokens]
+            skiprows += 1
+    raise ValueError(f"文件开头{_SNIFF_LINES}行内没有数值数据: {path}")
+
+def iter_chunks(path, chunk_rows=DEFAULT_CHUNK_ROWS, dtype=float, fmt=None):
+    """
+    分块读取文本数据文件
+
+    参数:
+        path: 文件路径
+        chunk_rows: 每块的行数
+        dtype: 数据类型
+        fmt: 已探测到的 (分隔符, 跳过行数)，None时调用sniff_format探测
+
+    返回:
+        生成器，每次给出形状为(行数, 列数)的数组
+    """
+    delimiter, skiprows = fmt if fmt is not None else sniff_format(path)[:2]
+    with open(path) as f, warnings.catch_warnings():
+        # 行数恰为chunk_rows整数倍时最后一次读取为空
+        warnings.simplefilter('ignore', UserWarning)
+        for _ in range(skiprows):
+            next(f)
+        while True:
+            chunk = np.loadtxt(f, delimiter=delimiter, dtype=dtype, comments='#',
+                               max_rows=chunk_rows, ndmin=2)
+            if len(chunk) == 0:
+                break
+            yield chunk
+            if len(chunk) < chunk_rows:
+                break
+
+def cache_path(path):
+    """文本文件对应的二进制缓存路径"""
+    return os.fspath(path) + CACHE_SUFFIX
+
+def _read_cache(path, stat, dtype):
+    """读取仍然有效的缓存，失效或损坏时返回None"""
+    try:
+        with np.load(cache_path(path), allow_pickle=False) as cached:
+            if (int(cached['mtime_ns']) != stat.st_mtime_ns
+                    or int(cached['size']) != stat.st_size
+                    or cached['data'].dtype != np.dtype(dtype)):
+                return None
+            columns = list(cached['columns']) if cached['columns'].size else None
+            return cached['data'], columns
+    except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile):
+        return None
+
+def _write_cache(path, stat, data, columns):
+    """写入缓存；目录不可写时跳过"""
+    target = cache_path(path)
+    tmp = target + '.tmp.npz'
+    try:
+        np.savez(tmp, data=data, mtime_ns=stat.st_mtime_ns, size=stat.st_size,
+                 columns=np.array(columns or [], dtype=str))
+        os.replace(tmp, target)
+    except OSError:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+def read_table(path, dtype=float, chunk_rows=DEFAULT_CHUNK_ROWS, cache=True):
+    """
+    读取数据文件为二维数组
+
+    参数:
+        path: 文本文件或.npy/.npz文件路径。.npz中的各数组按存储顺序作为列
+        dtype: 数据类型
+        chunk_rows: 文本分块读取的行数
+        cache: 是否使用并更新二进制缓存
+
+    返回:
+        data: 形状为(行数, 列数)的数组
+        columns: 列名列表，没有表头时为None
+    """
+    path = os.fspath(path)
+    if path.endswith('.npy'):
+        return np.atleast_2d(np.load(path).astype(dtype, copy=False).T).T, None
+    if path.endswith('.npz'):
+        with np.load(path, allow_pickle=False) as archive:
+            columns = list(archive.files)
+            data = np.column_stack([archive[name].astype(dtype, copy=False) for name in columns])
+        return data, columns
+
+    stat = os.stat(path)
+    if cache:
+        cached = _read_cache(path, stat, dtype)
+        if cached is not None:
+            return cached
+    delimiter, skiprows, columns = sniff_format(path)
+    chunks = list(iter_chunks(path, chunk_rows, dtype, fmt=(delimiter, skiprows)))
+    if not chunks:
+        raise ValueError(f"文件中没有数据: {path}")
+    data = chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+    if cache:
+        _write_cache(path, stat, data, columns)
+    return data, columns
+
+def load_columns(path, n_columns=2, **kwargs):
+    """
+    读取数据文件的前n_columns列
+
+    参数:
+        path: 数据文件路径
+        n_columns: 返回的列数
+        **kwargs: 传给read_table的参数
+
+    返回:
+        各列的一维数组组成的元组
+    """
+    data, _ = read_table(path, **kwargs)
+    if data.shape[1] < n_columns:
+        raise ValueError(f"文件只有{data.shape[1]}列，需要{n_columns}列: {path}")
+    return tuple(data[:, k] for k in range(n_columns))
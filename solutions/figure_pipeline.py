@@ -0,0 +1,220 @@
+"""
+批量渲染图像（解决方案）
+
+每个渲染任务由绘图函数、参数和输出路径组成。任务在进程池中用Agg后端
+渲染并保存；同一进程内相同尺寸的图像对象被反复使用，不为每张图重新
+创建。每个输出文件旁保存一个 <文件名>.hash，记录绘图函数、其所在模块的
+源码、参数和dpi的哈希值；再次渲染时哈希值一致且输出文件存在的任务被跳过。
+"""
+
+import hashlib
+import inspect
+import os
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+HASH_SUFFIX = '.hash'
+DEFAULT_DPI = 300
+
+FigureJob = namedtuple('FigureJob', ['func', 'path', 'args', 'kwargs', 'figsize'],
+                       defaults=((), {}, None))
+FigureJob.__doc__ = """
+渲染任务
+
+    func: 绘图函数，返回matplotlib图像对象；需可被pickle（模块级函数）
+    path: 输出文件路径，格式由扩展名决定
+    args, kwargs: 传给func的参数
+    figsize: 给定且func接受ax参数时，在进程内复用该尺寸的图像，
+             把坐标轴通过ax传给func；None时由func自行创建并在保存后关闭
+"""
+
+# 工作进程内复用的图像，键为figsize
+_figures = {}
+_module_digests = {}
+
+def _update_hash(h, value):
+    """把参数按类型和内容写入哈希对象"""
+    if isinstance(value, np.ndarray):
+        h.update(f"ndarray{value.dtype.str}{value.shape}".encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple)):
+        h.update(f"{type(value).__name__}{len(value)}".encode())
+        for item in value:
+            _update_hash(h, item)
+    elif isinstance(value, dict):
+        h.update(f"dict{len(value)}".encode())
+        for key in sorted(value, key=repr):
+            _update_hash(h, key)
+            _update_hash(h, value[key])
+    elif callable(value) and hasattr(value, '__qualname__'):
+        h.update(f"{value.__module__}.{value.__qualname__}".encode())
+    else:
+        h.update(f"{type(value).__name__}:{value!r}".encode())
+
+def _module_digest(func):
+    """绘图函数所在模块源码的哈希值，修改绘图代码后任务随之失效"""
+    module = func.__module__
+    if module not in _module_digests:
+        path = getattr(sys.modules.get(module), '__file__', None)
+        digest = ''
+        if path and os.path.exists(path):
+            with open(path, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+        _module_digests[module] = digest
+    return _module_digests[module]
+
+def job_hash(job, dpi=DEFAULT_DPI):
+    """
+    计算渲染任务输入的哈希值
+
+    参数:
+        job: FigureJob
+        dpi: 分辨率
+
+    返回:
+        十六进制哈希字符串
+    """
+    h = hashlib.sha256()
+    _update_hash(h, job.func)
+    h.update(_module_digest(job.func).encode())
+    _update_hash(h, (tuple(job.args), dict(job.kwargs), job.figsize, dpi))
+    return h.hexdigest()
+
+def hash_path(path):
+    """输出文件对应的哈希记录路径"""
+    return os.fspath(path) + HASH_SUFFIX
+
+def is_up_to_date(job, digest):
+    """输出文件存在且记录的哈希值与digest一致"""
+    try:
+        with open(hash_path(job.path)) as f:
+            return f.read().strip() == digest and os.path.exists(job.path)
+    except OSError:
+        return False
+
+def _init_worker():
+    """工作进程初始化：固定使用Agg后端"""
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+
+def _accepts_ax(func):
+    try:
+        return 'ax' in inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return False
+
+def _render(job, digest, dpi):
+    """渲染并保存一个任务；先写临时文件再替换，最后写入哈希记录"""
+    import matplotlib.pyplot as plt
+    from matplotlib.figure import Figure
+
+    reuse = job.figsize is not None and _accepts_ax(job.func)
+    if reuse:
+        # 复用的图像不注册到pyplot，不会被plt.show()显示
+        fig = _figures.get(tuple(job.figsize))
+        if fig is None:
+            fig = _figures[tuple(job.figsize)] = Figure(figsize=job.figsize)
+        fig.clear()
+        fig = job.func(*job.args, ax=fig.add_subplot(), **job.kwargs)
+    else:
+        fig = job.func(*job.args, **job.kwargs)
+
+    path = os.fspath(job.path)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    root, ext = os.path.splitext(path)
+    tmp_path = f"{root}.{os.getpid()}.tmp{ext}"
+    try:
+        fig.savefig(tmp_path, dpi=dpi)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        if not reuse:
+            plt.close(fig)
+    with open(hash_path(path), 'w') as f:
+        f.write(digest)
+    return path
+
+def render_figures(jobs, workers=None, dpi=DEFAULT_DPI, force=False):
+    """
+    批量渲染图像
+
+    参数:
+        jobs: FigureJob列表
+        workers: 并行进程数，None或1时在当前进程渲染
+        dpi: 分辨率
+        force: 为True时忽略哈希记录，全部重新渲染
+
+    返回:
+        rendered: 与jobs对应的布尔列表，True表示重新渲染，False表示已是最新而跳过
+    """
+    jobs = [FigureJob(*job) if not isinstance(job, FigureJob) else job for job in jobs]
+    paths = [os.path.abspath(job.path) for job in jobs]
+    if len(set(paths)) != len(paths):
+        raise ValueError("渲染任务的输出路径不能重复")
+
+    digests = [job_hash(job, dpi) for job in jobs]
+    pending = [i for i, (job, digest) in enumerate(zip(jobs, digests))
+               if force or not is_up_to_date(job, digest)]
+
+    if workers is None or workers <= 1 or len(pending) <= 1:
+        from solutions.plotting import pyplot
+        pyplot()
+        for i in pending:
+            _render(jobs[i], digests[i], dpi)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending)),
+                                 initializer=_init_worker) as pool:
+            futures = [pool.submit(_render, jobs[i], digests[i], dpi) for i in pending]
+            for future in futures:
+                future.result()
+
+    rendered = [False] * len(jobs)
+    for i in pending:
+        rendered[i] = True
+    return rendered
+
+def report_jobs(output_dir='results/figures', millikan_file='data/millikan.txt'):
+    """
+    生成报告所需的全部渲染任务
+
+    参数:
+        output_dir: 图像输出目录
+        millikan_file: 光电效应数据文件，不存在时跳过该图
+
+    返回:
+        jobs: FigureJob列表
+    """
+    from solutions.logistic_map_solution import (plot_bifurcation, plot_lyapunov,
+                                                 plot_time_series)
+    from solutions.millikan_fit_solution import calculate_parameters, load_data, plot_data_and_fit
+
+    jobs = [FigureJob(plot_time_series, os.path.join(output_dir, f"logistic_r{r}.png"),
+                      (r, 0.5, 100), figsize=(10, 6))
+            for r in (2.0, 3.2, 3.45, 3.6)]
+    jobs.append(FigureJob(plot_bifurcation, os.path.join(output_dir, "bifurcation.png"),
+                          (2.5, 4.0, 1000, 1000, 100), figsize=(12, 8)))
+    jobs.append(FigureJob(plot_lyapunov, os.path.join(output_dir, "lyapunov.png"),
+                          (2.5, 4.0, 1000, 500, 1000), figsize=(12, 6)))
+    if os.path.exists(millikan_file):
+        # 传入数据数组而不是文件名，数据变化时哈希值随之变化
+        x, y = load_data(millikan_file)
+        m, c = calculate_parameters(x, y)[:2]
+        jobs.append(FigureJob(plot_data_and_fit, os.path.join(output_dir, "millikan_fit.png"),
+                              (x, y, m, c), figsize=(6.4, 4.8)))
+    return jobs
+
+def main():
+    """重新生成报告图像，只渲染输入发生变化的图"""
+    jobs = report_jobs()
+    rendered = render_figures(jobs, workers=os.cpu_count())
+    for job, done in zip(jobs, rendered):
+        print(f"{'渲染' if done else '跳过'}: {job.path}")
+
+if __name__ == "__main__":
+    main()
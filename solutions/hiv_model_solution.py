@@ -1,5 +1,10 @@
 import numpy as np
-import matplotlib.pyplot as plt
+
+from solutions.basis_cache import exponential_basis
+from solutions.data_io import load_columns
+from solutions.least_squares import (fit_exponential_sum, levenberg_marquardt,
+                                     levenberg_marquardt_batch, pad_series)
+from solutions.plotting import pyplot, show
 
 class HIVModel:
     def __init__(self, A, alpha, B, beta):
@@ -9,22 +14,343 @@ class HIVModel:
         self.beta = beta
 
     def viral_load(self, time):
-        return self.A * np.exp(-self.alpha * time) + self.B * np.exp(-self.beta * time)
+        """
+        计算病毒载量 V(t) = A e^{-alpha t} + B e^{-beta t}
+
+        参数可以是数组，此时与时间网格做外积广播，一次返回整个参数×时间曲面，
+        结果形状为 参数广播后的形状 + time.shape。指数基函数经LRU缓存计算。
+        """
+        time = np.asarray(time, dtype=float)
+        expand = (Ellipsis,) + (np.newaxis,) * time.ndim
+        A = np.asarray(self.A, dtype=float)[expand]
+        B = np.asarray(self.B, dtype=float)[expand]
+        return (A * exponential_basis(self.alpha, time)
+                + B * exponential_basis(self.beta, time))
+
+    def jacobian(self, time):
+        """
+        V(t)对参数(A, alpha, B, beta)的解析雅可比矩阵，形状为(len(time), 4)
+        """
+        ea = np.exp(-self.alpha * time)
+        eb = np.exp(-self.beta * time)
+        return np.stack([ea, -self.A * time * ea, eb, -self.B * time * eb], axis=-1)
+
+    @classmethod
+    def fit(cls, time, load, tail_fraction=0.5, max_iter=200, tol=1e-10, method='lm'):
+        """
+        拟合双指数模型
+
+        method='lm'时用Levenberg-Marquardt方法和解析雅可比矩阵对四个参数
+        同时迭代，初值由尾部对数线性回归给出（见estimate_initial_parameters）；
+        method='varpro'时用变量投影法只在(alpha, beta)上迭代，A、B闭式求解，
+        不需要初值。两种方法都把较快的速率记为alpha。
+
+        参数:
+            time: 时间数组
+            load: 病毒载量数组
+            tail_fraction: 用于估计慢衰减项的尾部数据比例
+            max_iter: 最大迭代次数
+            tol: 参数相对变化的收敛容差
+            method: 'lm'或'varpro'
+
+        返回:
+            params: 拟合参数数组(A, alpha, B, beta)
+            covariance: 参数的4×4协方差矩阵
+        """
+        time = np.asarray(time, dtype=float)
+        load = np.asarray(load, dtype=float)
+        if method == 'varpro':
+            amplitudes, rates, covariance = fit_exponential_sum(
+                time, load, 2, max_iter=max_iter, tol=tol)
+            return np.array([amplitudes[0], rates[0], amplitudes[1], rates[1]]), covariance
+        if method != 'lm':
+            raise ValueError(f"未知的拟合方法: {method}")
+        p0 = estimate_initial_parameters(time, load, tail_fraction)
+
+        # 残差由雅可比矩阵中的指数列组合得到，迭代中的试探速率不进入基函数缓存
+        def residual_and_jacobian(p):
+            J = cls(*p).jacobian(time)
+            return J[:, 0] * p[0] + J[:, 2] * p[2] - load, J
+
+        params, covariance = levenberg_marquardt(residual_and_jacobian, p0,
+                                                 max_iter=max_iter, tol=tol)
+        return _order_terms(params, covariance)
+
+    @classmethod
+    def fit_global(cls, time, load, n_grid=1000, n_starts=5, rate_range=None,
+                   max_iter=200, tol=1e-10):
+        """
+        全局搜索拟合双指数模型
+
+        先用hiv_grid_search在(alpha, beta)对数网格上求出全部节点的残差，
+        再从残差最小的n_starts个网格局部极小值出发，用变量投影法局部细化，
+        取残差最小的结果。网格只包含alpha > beta的组合，
+        不会收敛到两项对调或alpha≈beta的退化解。
+
+        参数:
+            time: 时间数组
+            load: 病毒载量数组
+            n_grid: 每个速率方向的网格点数
+            n_starts: 局部细化的起点个数
+            rate_range: 速率搜索范围(min, max)，默认见hiv_grid_search
+            max_iter: 局部细化的最大迭代次数
+            tol: 局部细化的收敛容差
+
+        返回:
+            params: 拟合参数数组(A, alpha, B, beta)
+            covariance: 参数的4×4协方差矩阵
+        """
+        time = np.asarray(time, dtype=float)
+        load = np.asarray(load, dtype=float)
+        rates, cost = hiv_grid_search(time, load, n_grid, rate_range)
+
+        # 网格上的局部极小值：不大于八邻域的节点
+        padded = np.pad(cost, 1, constant_values=np.inf)
+        minimum = np.isfinite(cost)
+        for di in (-1, 0, 1):
+            for dj in (-1, 0, 1):
+                if di or dj:
+                    minimum &= cost <= padded[1 + di:1 + di + n_grid, 1 + dj:1 + dj + n_grid]
+        candidates = np.flatnonzero(minimum)
+        candidates = candidates[np.argsort(cost.ravel()[candidates])[:n_starts]]
+        if len(candidates) == 0:
+            raise ValueError("网格上没有有效的速率组合")
+
+        best = None
+        for flat in candidates:
+            i, j = divmod(flat, n_grid)
+            try:
+                amplitudes, fitted_rates, covariance = fit_exponential_sum(
+                    time, load, 2, rates0=[rates[i], rates[j]], max_iter=max_iter, tol=tol)
+            except np.linalg.LinAlgError:
+                continue
+            params = np.array([amplitudes[0], fitted_rates[0], amplitudes[1], fitted_rates[1]])
+            residual = cls(*params).jacobian(time)[:, [0, 2]] @ amplitudes - load
+            if best is None or residual @ residual < best[0]:
+                best = (residual @ residual, params, covariance)
+        if best is None:
+            raise np.linalg.LinAlgError("所有起点的局部细化均失败")
+        return best[1], best[2]
+
+    @classmethod
+    def fit_batch(cls, series, tail_fraction=0.5, max_iter=200, tol=1e-10):
+        """批量拟合多条序列，见fit_hiv_batch"""
+        return fit_hiv_batch(series, tail_fraction, max_iter, tol)
 
     def plot_model(self, time):
         viral_load = self.viral_load(time)
+        plt = pyplot()
         plt.plot(time, viral_load)
         plt.xlabel('Time (days)')
         plt.ylabel('Viral Load')
         plt.title('HIV Viral Load Model')
-        plt.show()
+        show()
+
+def _order_terms(params, covariance):
+    """
+    交换两项使较快的速率记为alpha（alpha >= beta），协方差矩阵随之重排
+
+    参数:
+        params: 形状为(..., 4)的参数(A, alpha, B, beta)
+        covariance: 形状为(..., 4, 4)的协方差矩阵
+
+    返回:
+        params, covariance: 排序后的副本
+    """
+    params = np.array(params, dtype=float)
+    covariance = np.array(covariance, dtype=float)
+    swap = params[..., 1] < params[..., 3]
+    order = [2, 3, 0, 1]
+    params[swap] = params[swap][..., order]
+    covariance[swap] = covariance[swap][..., order, :][..., order]
+    return params, covariance
+
+def _masked_linear_fit(x, y, mask):
+    """
+    按行对掩码内的点做 y = slope * x + intercept 的最小二乘拟合
+
+    返回:
+        slope, intercept: 每行的斜率和截距；有效点少于2个的行为nan
+    """
+    w = mask.astype(float)
+    x = np.where(mask, x, 0.0)
+    y = np.where(mask, y, 0.0)
+    n = w.sum(axis=-1)
+    sx = x.sum(axis=-1)
+    sy = y.sum(axis=-1)
+    sxx = (x * x).sum(axis=-1)
+    sxy = (x * y).sum(axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        denominator = n * sxx - sx ** 2
+        slope = np.where(n >= 2, (n * sxy - sx * sy) / denominator, np.nan)
+        intercept = (sy - slope * sx) / n
+    return slope, intercept
+
+def _estimate_initial_batch(time, load, n_points, tail_fraction):
+    """
+    estimate_initial_parameters的批量版本
+
+    参数:
+        time, load: 形状为(n_series, max_len)的按时间排序的填充数组
+        n_points: 每条序列的有效点数
+        tail_fraction: 用于估计慢衰减项的尾部数据比例
+
+    返回:
+        p0: 形状为(n_series, 4)的初值数组；尾部数据无法拟合的行为非有限值
+    """
+    n_points = np.asarray(n_points)
+    idx = np.arange(time.shape[-1])
+    valid = idx < n_points[:, np.newaxis]
+    n_tail = np.maximum(2, np.ceil(n_points * tail_fraction).astype(int))
+    tail = valid & (idx >= (n_points - n_tail)[:, np.newaxis])
+    early = valid & ~tail
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_load = np.log(load)
+        slope, intercept = _masked_linear_fit(time, log_load, tail & (load > 0))
+        beta, B = -slope, np.exp(intercept)
+
+        rest = load - B[:, np.newaxis] * np.exp(-beta[:, np.newaxis] * time)
+        slope, intercept = _masked_linear_fit(time, np.log(rest), early & (rest > 0))
+    ok = np.isfinite(slope)
+    alpha = np.where(ok, -slope, 10 * beta)
+    A = np.where(ok, np.exp(np.where(ok, intercept, 0.0)), load[:, 0] - B)
+    return np.stack([A, alpha, B, beta], axis=-1)
+
+def estimate_initial_parameters(time, load, tail_fraction=0.5):
+    """
+    用尾部对数线性回归估计双指数模型的初值
+
+    先对时间最靠后的tail_fraction比例的数据做 log(V) 的线性拟合得到慢衰减项
+    (B, beta)，再对早期数据减去慢项后的剩余部分做同样的拟合得到(A, alpha)。
+    剩余部分不可用时，A取 V(0) - B，alpha取beta的十倍。
+
+    返回:
+        p0: 初值数组(A, alpha, B, beta)
+    """
+    order = np.argsort(time)
+    p0 = _estimate_initial_batch(time[np.newaxis, order], load[np.newaxis, order],
+                                 [len(time)], tail_fraction)[0]
+    if not np.all(np.isfinite(p0)):
+        raise ValueError("尾部数据不足，无法估计初值")
+    return p0
+
+# fit_batch返回的参数表字段
+HIV_FIT_DTYPE = np.dtype([
+    ('A', 'f8'), ('alpha', 'f8'), ('B', 'f8'), ('beta', 'f8'),
+    ('A_err', 'f8'), ('alpha_err', 'f8'), ('B_err', 'f8'), ('beta_err', 'f8'),
+    ('cost', 'f8'), ('n_points', 'i8'), ('converged', '?'),
+])
+
+def hiv_grid_search(time, load, n_grid=1000, rate_range=None):
+    """
+    在(alpha, beta)对数网格上计算双指数模型的最小残差平方和
+
+    每个节点上A、B是线性最小二乘的闭式解。网格上的指数基函数只计算一次，
+    所有节点的2×2正规方程由基函数的Gram矩阵 E E^T 和投影 E y 组装，
+    残差平方和为 |y|^2 - A (e_a·y) - B (e_b·y)，整个网格一次批量求解。
+
+    参数:
+        time: 时间数组
+        load: 病毒载量数组
+        n_grid: 每个速率方向的网格点数
+        rate_range: 速率搜索范围(min, max)，默认为[0.1/T, 30/T]（T为时间跨度）
+
+    返回:
+        rates: 从大到小的速率网格
+        cost: 形状为(n_grid, n_grid)的残差平方和，cost[i, j]对应
+              alpha = rates[i]、beta = rates[j]；alpha <= beta或正规方程
+              近奇异的节点为inf
+    """
+    time = np.asarray(time, dtype=float)
+    load = np.asarray(load, dtype=float)
+    if rate_range is None:
+        span = np.max(time) - np.min(time)
+        if span <= 0:
+            raise ValueError("时间跨度必须为正")
+        rate_range = (0.1 / span, 30 / span)
+    if not 0 < rate_range[0] < rate_range[1]:
+        raise ValueError("速率范围必须满足 0 < min < max")
+    rates = np.geomspace(rate_range[0], rate_range[1], n_grid)[::-1]
+
+    E = np.exp(-np.outer(rates, time))
+    gram = E @ E.T
+    proj = E @ load
+    norm = np.einsum('ii->i', gram)
+
+    s_aa = norm[:, np.newaxis]
+    s_bb = norm[np.newaxis, :]
+    y_a = proj[:, np.newaxis]
+    y_b = proj[np.newaxis, :]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        det = s_aa * s_bb - gram ** 2
+        A = (s_bb * y_a - gram * y_b) / det
+        B = (s_aa * y_b - gram * y_a) / det
+        cost = load @ load - A * y_a - B * y_b
+    valid = np.triu(np.ones((n_grid, n_grid), dtype=bool), k=1)
+    valid &= det > 1e-10 * s_aa * s_bb
+    cost[~valid] = np.inf
+    # 相减造成的舍入误差可能给出微小负值
+    np.maximum(cost, 0.0, out=cost)
+    return rates, cost
+
+def fit_hiv_batch(series, tail_fraction=0.5, max_iter=200, tol=1e-10):
+    """
+    批量拟合多条病毒载量序列
+
+    所有序列填充为矩形数组并用掩码屏蔽填充位置，每次迭代对所有尚未收敛的
+    序列同时计算残差和解析雅可比矩阵（见levenberg_marquardt_batch）。
+    与HIVModel.fit相同，每行较快的速率记为alpha。
+    数据点少于4个或无法估计初值的序列（如重抽样后尾部时间全部相同）不参与
+    迭代，参数为nan，converged为False，其余序列照常拟合。
+
+    参数:
+        series: (time, load)数组对的序列
+        tail_fraction: 用于估计慢衰减项的尾部数据比例
+        max_iter: 最大迭代次数
+        tol: 参数相对变化的收敛容差
+
+    返回:
+        table: HIV_FIT_DTYPE结构化数组，每条序列一行
+    """
+    time, load, n_points = pad_series(series)
+    if time.shape[1] == 0:
+        # 没有序列或所有序列都为空，无从估计初值
+        table = np.zeros(len(series), dtype=HIV_FIT_DTYPE)
+        for name in HIV_FIT_DTYPE.names:
+            if HIV_FIT_DTYPE[name].kind == 'f':
+                table[name] = np.nan
+        table['n_points'] = n_points
+        return table
+    mask = np.arange(time.shape[1]) < n_points[:, np.newaxis]
+
+    def residual_and_jacobian(p, rows):
+        J = HIVModel(*(p[:, k, np.newaxis] for k in range(4))).jacobian(time[rows])
+        m = mask[rows]
+        fitted = J[..., 0] * p[:, 0, np.newaxis] + J[..., 2] * p[:, 2, np.newaxis]
+        r = np.where(m, fitted - load[rows], 0.0)
+        return r, J * m[..., np.newaxis]
+
+    p0 = _estimate_initial_batch(time, load, n_points, tail_fraction)
+    # 点数不足的序列初值记为nan，levenberg_marquardt_batch不对其迭代
+    p0[n_points < 4] = np.nan
+    p, covariance, cost, converged = levenberg_marquardt_batch(
+        residual_and_jacobian, p0, n_points, max_iter=max_iter, tol=tol)
+    p, covariance = _order_terms(p, covariance)
+    errors = np.sqrt(np.abs(np.einsum('nii->ni', covariance)))
+
+    table = np.zeros(len(series), dtype=HIV_FIT_DTYPE)
+    for k, name in enumerate(('A', 'alpha', 'B', 'beta')):
+        table[name] = p[:, k]
+        table[name + '_err'] = errors[:, k]
+    table['cost'] = cost
+    table['n_points'] = n_points
+    table['converged'] = converged
+    return table
 
 def load_hiv_data(filepath):
-    try:
-        data = np.loadtxt(filepath)
-        return data['time_in_days'], data['viral_load']
-    except:
-        return np.loadtxt(filepath, delimiter=',', unpack=True)
+    """读取(时间, 病毒载量)两列数据，格式探测与缓存见solutions.data_io"""
+    return load_columns(filepath)
 
 def main():
     # 初始化模型参数
@@ -37,12 +363,13 @@ def main():
     model.plot_model(time)
     
     # 加载实验数据
-    time_data, load_data = load_hiv_data('data/HIVseries.npz')
+    time_data, load_data = load_hiv_data('data/HIVseries.csv')
     
     # 绘制实验数据
+    plt = pyplot()
     plt.scatter(time_data, load_data, label='Experimental Data')
     plt.legend()
-    plt.show()
+    show()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,302 @@
+"""
+非线性最小二乘求解器（解决方案）
+
+包含通用的Levenberg-Marquardt求解器，以及针对可分离模型
+y ≈ Φ(θ) c（对系数c线性、对参数θ非线性）的变量投影法。
+"""
+
+import warnings
+from itertools import combinations
+
+import numpy as np
+
+class ConvergenceWarning(RuntimeWarning):
+    """迭代求解在最大迭代次数内未收敛"""
+
+def levenberg_marquardt(residual_and_jacobian, p0, max_iter=200, tol=1e-10):
+    """
+    Levenberg-Marquardt最小二乘求解器
+
+    参数:
+        residual_and_jacobian: 函数p -> (残差向量, 雅可比矩阵)
+        p0: 初始参数
+        max_iter: 最大迭代次数
+        tol: 参数相对变化的收敛容差
+
+    返回:
+        params: 最优参数
+        covariance: 参数协方差矩阵 s^2 (J^T J)^-1，s^2为残差方差
+
+    max_iter次迭代内未收敛时发出ConvergenceWarning，返回最后一次接受的参数。
+    """
+    p = np.array(p0, dtype=float)
+    r, J = residual_and_jacobian(p)
+    cost = r @ r
+    lam = 1e-3
+    converged = False
+    for _ in range(max_iter):
+        JTJ = J.T @ J
+        g = J.T @ r
+        # Marquardt缩放：阻尼项正比于JTJ的对角线，适应参数量级的差异
+        D = np.diag(np.diag(JTJ))
+        try:
+            step = np.linalg.solve(JTJ + lam * D, -g)
+        except np.linalg.LinAlgError:
+            lam *= 10
+            continue
+        p_new = p + step
+        # 试探步可能使指数溢出，此时代价为inf/nan，按失败步处理
+        with np.errstate(over='ignore', invalid='ignore'):
+            try:
+                r_new, J_new = residual_and_jacobian(p_new)
+                cost_new = r_new @ r_new
+            except np.linalg.LinAlgError:
+                cost_new = np.inf
+        if np.isfinite(cost_new) and cost_new < cost:
+            converged = np.all(np.abs(step) <= tol * (np.abs(p) + tol))
+            p, r, J, cost = p_new, r_new, J_new, cost_new
+            lam = max(lam / 10, 1e-12)
+            if converged:
+                break
+        else:
+            lam *= 10
+            if lam > 1e12:
+                # 与levenberg_marquardt_batch相同：阻尼增大到上限仍无法下降，
+                # 说明已停在极小值处（受舍入误差限制）
+                converged = True
+                break
+    if not converged:
+        warnings.warn(f"Levenberg-Marquardt迭代在{max_iter}次内未收敛",
+                      ConvergenceWarning, stacklevel=2)
+
+    dof = max(len(r) - len(p), 1)
+    covariance = np.linalg.pinv(J.T @ J) * (cost / dof)
+    return p, covariance
+
+def pad_series(series):
+    """
+    把长度不一的(time, value)序列按时间排序后填充为矩形数组
+
+    参数:
+        series: (time, value)数组对的序列
+
+    返回:
+        time, values: 形状为(n_series, max_len)的数组，填充位置为0
+        n_points: 每条序列的有效点数
+    """
+    n_points = np.array([len(t) for t, _ in series], dtype=int)
+    max_len = n_points.max() if len(series) else 0
+    time = np.zeros((len(series), max_len))
+    values = np.zeros((len(series), max_len))
+    for i, (t, v) in enumerate(series):
+        order = np.argsort(t)
+        time[i, :n_points[i]] = np.asarray(t, dtype=float)[order]
+        values[i, :n_points[i]] = np.asarray(v, dtype=float)[order]
+    return time, values, n_points
+
+def _batched_solve(A, b):
+    """求解一批线性方程组，奇异的方程组改用伪逆"""
+    try:
+        return np.linalg.solve(A, b[..., np.newaxis])[..., 0]
+    except np.linalg.LinAlgError:
+        return np.einsum('nij,nj->ni', np.linalg.pinv(A), b)
+
+def levenberg_marquardt_batch(residual_and_jacobian, p0, n_points, max_iter=200, tol=1e-10):
+    """
+    批量Levenberg-Marquardt求解器
+
+    每次迭代对所有尚未收敛的问题同时求解k×k的阻尼正规方程组，每个问题有
+    独立的阻尼系数。初始残差或雅可比矩阵非有限的问题不参与迭代，结果为nan。
+
+    参数:
+        residual_and_jacobian: 函数(p, rows) -> (r, J)，p形状为(len(rows), k)，
+                               r形状为(len(rows), m)，J形状为(len(rows), m, k)；
+                               填充位置的残差和雅可比矩阵应为0
+        p0: 形状为(n, k)的初始参数
+        n_points: 每个问题的有效数据点数，用于计算残差方差
+        max_iter: 最大迭代次数
+        tol: 参数相对变化的收敛容差
+
+    返回:
+        params: 形状为(n, k)的最优参数
+        covariance: 形状为(n, k, k)的参数协方差矩阵
+        cost: 每个问题的残差平方和
+        converged: 每个问题是否收敛
+    """
+    p = np.array(p0, dtype=float)
+    n, k = p.shape
+    all_rows = np.arange(n)
+    with np.errstate(over='ignore', invalid='ignore'):
+        r, J = residual_and_jacobian(p, all_rows)
+        cost = np.einsum('nl,nl->n', r, r)
+    finite = np.isfinite(cost) & np.all(np.isfinite(J), axis=(1, 2))
+    p[~finite] = np.nan
+    cost[~finite] = np.nan
+    lam = np.full(n, 1e-3)
+    converged = np.zeros(n, dtype=bool)
+    active = finite.copy()
+
+    for _ in range(max_iter):
+        rows = np.nonzero(active)[0]
+        if len(rows) == 0:
+            break
+        Ja, ra = J[rows], r[rows]
+        JTJ = np.einsum('nli,nlj->nij', Ja, Ja)
+        g = np.einsum('nli,nl->ni', Ja, ra)
+        diag = np.einsum('nii->ni', JTJ)
+        damped = JTJ + lam[rows, np.newaxis, np.newaxis] * (
+            diag[:, :, np.newaxis] * np.eye(k))
+        step = _batched_solve(damped, -g)
+
+        p_new = p[rows] + step
+        with np.errstate(over='ignore', invalid='ignore'):
+            r_new, J_new = residual_and_jacobian(p_new, rows)
+            cost_new = np.einsum('nl,nl->n', r_new, r_new)
+
+        better = np.isfinite(cost_new) & (cost_new < cost[rows])
+        small = np.all(np.abs(step) <= tol * (np.abs(p[rows]) + tol), axis=-1)
+        accept = rows[better]
+        p[accept] = p_new[better]
+        r[accept] = r_new[better]
+        J[accept] = J_new[better]
+        cost[accept] = cost_new[better]
+        lam[accept] = np.maximum(lam[accept] / 10, 1e-12)
+        lam[rows[~better]] *= 10
+
+        # 阻尼增大到上限仍无法下降，说明已停在极小值处（受舍入误差限制）
+        stalled = ~better & (lam[rows] > 1e12)
+        done = (better & small) | stalled
+        converged[rows[done]] = True
+        active[rows[done]] = False
+
+    covariance = np.full((n, k, k), np.nan)
+    JTJ = np.einsum('nli,nlj->nij', J[finite], J[finite])
+    dof = np.maximum(np.asarray(n_points)[finite] - k, 1)
+    covariance[finite] = np.linalg.pinv(JTJ) * (cost[finite] / dof)[:, np.newaxis, np.newaxis]
+    return p, covariance, cost, converged
+
+def variable_projection(basis, theta0, y, max_iter=200, tol=1e-10):
+    """
+    变量投影法求解可分离最小二乘问题 min ||Φ(θ) c - y||
+
+    对给定的θ，线性系数c由最小二乘闭式求出，因此非线性迭代只在θ上进行，
+    不需要c的初值。约化残差的雅可比矩阵采用Kaufman近似 J_k = P⊥ (∂Φ/∂θ_k) c。
+
+    参数:
+        basis: 函数θ -> (Phi, dPhi)，Phi形状为(m, n_linear)，
+               dPhi形状为(len(θ), m, n_linear)，dPhi[k] = ∂Φ/∂θ_k
+        theta0: 非线性参数的初值
+        y: 数据向量
+        max_iter: 最大迭代次数
+        tol: 参数相对变化的收敛容差
+
+    返回:
+        theta: 最优非线性参数
+        coefficients: 对应的线性系数
+    """
+    y = np.asarray(y, dtype=float)
+
+    def solve_linear(theta):
+        Phi, dPhi = basis(theta)
+        if not np.all(np.isfinite(Phi)):
+            raise np.linalg.LinAlgError("基函数矩阵含有非有限值")
+        Q, R = np.linalg.qr(Phi)
+        coefficients = np.linalg.lstsq(R, Q.T @ y, rcond=None)[0]
+        return Phi, dPhi, Q, coefficients
+
+    def residual_and_jacobian(theta):
+        Phi, dPhi, Q, coefficients = solve_linear(theta)
+        residual = Phi @ coefficients - y
+        # dPhi @ c 的每一列投影到Φ列空间的正交补上
+        D = np.einsum('kmj,j->mk', dPhi, coefficients)
+        J = D - Q @ (Q.T @ D)
+        return residual, J
+
+    theta, _ = levenberg_marquardt(residual_and_jacobian, theta0, max_iter=max_iter, tol=tol)
+    coefficients = solve_linear(theta)[3]
+    return theta, coefficients
+
+def _exponential_basis(t, log_rates):
+    """指数基函数 exp(-λ_k t) 及其对 log λ_k 的导数"""
+    rates = np.exp(log_rates)
+    Phi = np.exp(-np.outer(t, rates))
+    dPhi = np.zeros((len(rates),) + Phi.shape)
+    for k, rate in enumerate(rates):
+        dPhi[k, :, k] = -rate * t * Phi[:, k]
+    return Phi, dPhi
+
+def exponential_grid_start(t, y, n_terms, n_grid=16):
+    """
+    在对数速率网格上搜索指数和模型的起点
+
+    速率网格在 [0.1/T, 30/T] 上等比分布（T为时间跨度），对所有严格递减的
+    速率组合闭式求解幅度并比较残差。上限不取到采样间隔的倒数，以免只拟合
+    个别早期点的极快分量被选为起点。
+
+    参数:
+        t: 时间数组
+        y: 数据数组
+        n_terms: 指数项数
+        n_grid: 每个速率方向的网格点数
+
+    返回:
+        rates0: 残差最小的速率组合（从大到小）
+    """
+    span = np.max(t) - np.min(t)
+    if span <= 0:
+        raise ValueError("时间跨度必须为正")
+    grid = np.geomspace(0.1 / span, 30 / span, n_grid)[::-1]
+
+    combos = np.array(list(combinations(range(n_grid), n_terms)))
+    rates = grid[combos]
+    E = np.exp(-rates[:, np.newaxis, :] * t[np.newaxis, :, np.newaxis])
+    with np.errstate(over='ignore', invalid='ignore'):
+        amplitudes = np.einsum('cjm,m->cj', np.linalg.pinv(E), y)
+        residual = np.einsum('cmj,cj->cm', E, amplitudes) - y
+        cost = np.einsum('cm,cm->c', residual, residual)
+    # 近奇异的组合可能给出非有限值，排除在外
+    cost[~np.isfinite(cost)] = np.inf
+    return rates[np.argmin(cost)]
+
+def fit_exponential_sum(t, y, n_terms=2, rates0=None, max_iter=200, tol=1e-10):
+    """
+    用变量投影法拟合N项指数和 y = Σ A_k exp(-λ_k t)
+
+    迭代只在 log λ_k 上进行（保证速率为正），幅度A_k每步闭式求解。
+
+    参数:
+        t: 时间数组
+        y: 数据数组
+        n_terms: 指数项数
+        rates0: 速率初值，默认由exponential_grid_start给出
+        max_iter: 最大迭代次数
+        tol: 参数相对变化的收敛容差
+
+    返回:
+        amplitudes: 幅度A_k，按速率从大到小排列
+        rates: 速率λ_k，从大到小排列
+        covariance: 参数(A_1, λ_1, A_2, λ_2, ...)的协方差矩阵
+    """
+    t = np.asarray(t, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if len(t) <= 2 * n_terms:
+        raise ValueError("数据点数必须多于参数个数")
+    if rates0 is None:
+        rates0 = exponential_grid_start(t, y, n_terms)
+
+    log_rates, amplitudes = variable_projection(
+        lambda theta: _exponential_basis(t, theta), np.log(rates0), y,
+        max_iter=max_iter, tol=tol)
+    rates = np.exp(log_rates)
+    order = np.argsort(rates)[::-1]
+    rates, amplitudes = rates[order], amplitudes[order]
+
+    # 在原始参数(A_k, λ_k)下计算完整雅可比矩阵，得到协方差
+    E = np.exp(-np.outer(t, rates))
+    J = np.empty((len(t), 2 * n_terms))
+    J[:, 0::2] = E
+    J[:, 1::2] = -amplitudes * t[:, np.newaxis] * E
+    residual = E @ amplitudes - y
+    dof = max(len(t) - 2 * n_terms, 1)
+    covariance = np.linalg.pinv(J.T @ J) * (residual @ residual / dof)
+    return amplitudes, rates, covariance
@@ -2,10 +2,55 @@
 Logistic映射与混沌系统研究（解决方案）
 """
 
+import json
+import os
+
 import numpy as np
-import matplotlib.pyplot as plt
 
-def iterate_logistic(r, x0, n):
+from solutions.plotting import figure_axes
+
+DEFAULT_CHUNK_SIZE = 65536
+_BATCH_BLOCK = 32
+
+def iter_logistic_chunks(r, x0, n, chunk_size=DEFAULT_CHUNK_SIZE, dtype=np.float64):
+    """
+    分块迭代Logistic映射的生成器
+
+    每次产出一个长度不超过chunk_size的数组，依次拼接即为完整轨道，
+    内存占用与轨道总长度无关。
+
+    参数:
+        r: 增长率参数
+        x0: 初始值
+        n: 迭代次数（轨道总长度，包含初始值）
+        chunk_size: 每块的长度
+        dtype: 浮点类型，如np.float32、np.float64、np.longdouble
+
+    产出:
+        chunk: 轨道的一段
+    """
+    if chunk_size <= 0:
+        raise ValueError("分块长度必须为正整数")
+
+    dtype = np.dtype(dtype)
+    if dtype == np.float64:
+        # 单条轨道无法在时间方向上向量化，用Python浮点数逐步迭代最快
+        r = float(r)
+        x = float(x0)
+    else:
+        r = dtype.type(r)
+        x = dtype.type(x0)
+    remaining = n
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        chunk = np.empty(size, dtype=dtype)
+        for k in range(size):
+            chunk[k] = x
+            x = r * x * (1 - x)
+        remaining -= size
+        yield chunk
+
+def iterate_logistic(r, x0, n, dtype=np.float64):
     """
     迭代Logistic映射
     
@@ -13,17 +58,246 @@ def iterate_logistic(r, x0, n):
         r: 增长率参数
         x0: 初始值
         n: 迭代次数
+        dtype: 浮点类型
         
     返回:
         x: 迭代序列数组
     """
-    x = np.zeros(n)
-    x[0] = x0
-    for i in range(1, n):
-        x[i] = r * x[i-1] * (1 - x[i-1])
+    x = np.empty(n, dtype=dtype)
+    pos = 0
+    for chunk in iter_logistic_chunks(r, x0, n, dtype=dtype):
+        x[pos:pos + len(chunk)] = chunk
+        pos += len(chunk)
     return x
 
-def plot_time_series(r, x0, n):
+def iterate_logistic_batch(r, x0, n, out=None, dtype=np.float64):
+    """
+    批量迭代多条Logistic轨道（所有轨道逐步同时推进）
+
+    参数:
+        r: 增长率参数，标量或数组
+        x0: 初始值，标量或数组，需与r可广播
+        n: 迭代次数
+        out: 可选的输出数组，形状须为 broadcast(r, x0).shape + (n,)，
+             重复扫描时可复用同一缓冲区
+        dtype: 浮点类型，给定out时须与out.dtype一致
+
+    返回:
+        x: 形状为 broadcast(r, x0).shape + (n,) 的迭代序列数组
+    """
+    dtype = np.dtype(dtype)
+    r = np.asarray(r, dtype=dtype)
+    x0 = np.asarray(x0, dtype=dtype)
+    shape = np.broadcast_shapes(r.shape, x0.shape)
+
+    if out is None:
+        out = np.empty(shape + (n,), dtype=dtype)
+    elif out.shape != shape + (n,):
+        raise ValueError(f"输出数组形状应为{shape + (n,)}，实际为{out.shape}")
+    elif out.dtype != dtype or not out.flags.c_contiguous:
+        raise ValueError(f"输出数组必须是C连续的{dtype}数组")
+    if n == 0 or out.size == 0:
+        return out
+
+    # 展平为(轨道数, n)，状态向量连续存放
+    flat = out.reshape(-1, n)
+    m = flat.shape[0]
+    r_flat = np.broadcast_to(r, shape).reshape(m)
+    x = np.broadcast_to(x0, shape).reshape(m).copy()
+    tmp = np.empty(m, dtype=dtype)
+
+    # 先按时间优先写入小块缓冲区，再整块转置写回，避免每步跨步写入
+    block = min(n, _BATCH_BLOCK)
+    buf = np.empty((block, m), dtype=dtype)
+    for start in range(0, n, block):
+        size = min(block, n - start)
+        for j in range(size):
+            if start + j > 0:
+                _logistic_step(r_flat, x, x, tmp)
+            buf[j] = x
+        flat[:, start:start + size] = buf[:size].T
+    return out
+
+class OrbitStatistics:
+    """
+    Logistic轨道的流式统计量
+
+    逐块累积最小值、最大值、直方图以及 log|r(1-2x)| 之和，
+    占用内存为常数，可用于极长轨道的不变密度和Lyapunov指数估计。
+    """
+
+    def __init__(self, r, n_bins=None, x_range=(0.0, 1.0)):
+        """
+        参数:
+            r: 增长率参数
+            n_bins: 直方图分箱数，为None时不统计直方图
+            x_range: 直方图的统计范围
+        """
+        self.r = r
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.log_derivative_sum = 0.0
+        if n_bins is None:
+            self.bin_edges = None
+            self.histogram = None
+        else:
+            self.bin_edges = np.linspace(x_range[0], x_range[1], n_bins + 1)
+            self.histogram = np.zeros(n_bins, dtype=np.int64)
+
+    def update(self, chunk):
+        """
+        累积一段轨道
+
+        参数:
+            chunk: 轨道的一段
+        """
+        if len(chunk) == 0:
+            return
+        self.count += len(chunk)
+        self.min = min(self.min, chunk.min())
+        self.max = max(self.max, chunk.max())
+        with np.errstate(divide='ignore'):
+            self.log_derivative_sum += np.log(np.abs(self.r * (1 - 2 * chunk))).sum()
+        if self.histogram is not None:
+            self.histogram += np.histogram(chunk, bins=self.bin_edges)[0]
+
+    @property
+    def lyapunov(self):
+        """Lyapunov指数估计值 λ = <log|r(1-2x)|>"""
+        if self.count == 0:
+            raise ValueError("尚未累积任何轨道点")
+        return self.log_derivative_sum / self.count
+
+def logistic_orbit_statistics(r, x0, n, n_discard=0, n_bins=None,
+                              chunk_size=DEFAULT_CHUNK_SIZE, dtype=np.float64):
+    """
+    流式计算长轨道的统计量，内存占用与n无关
+
+    参数:
+        r: 增长率参数
+        x0: 初始值
+        n: 迭代次数（包含被丢弃的点）
+        n_discard: 丢弃的初始迭代点数
+        n_bins: 直方图分箱数，为None时不统计直方图
+        chunk_size: 每块的长度
+        dtype: 浮点类型
+
+    返回:
+        stats: OrbitStatistics对象
+    """
+    stats = OrbitStatistics(r, n_bins=n_bins)
+    skipped = 0
+    for chunk in iter_logistic_chunks(r, x0, n, chunk_size, dtype=dtype):
+        if skipped < n_discard:
+            drop = min(n_discard - skipped, len(chunk))
+            skipped += drop
+            chunk = chunk[drop:]
+        stats.update(chunk)
+    return stats
+
+def _orbit_meta_path(path):
+    """轨道文件对应的元数据文件路径"""
+    return f"{path}.meta.json"
+
+def _write_orbit_meta(path, kind, r, x0, array):
+    """
+    写入轨道元数据（r、x0、n、dtype、形状）
+
+    r、x0按float64记录（np.longdouble不能直接序列化为JSON）；先写临时文件
+    再替换，写入失败时不留下不完整的元数据。
+    """
+    meta = {
+        'kind': kind,
+        'r': np.asarray(r, dtype=np.float64).tolist(),
+        'x0': np.asarray(x0, dtype=np.float64).tolist(),
+        'n': array.shape[-1],
+        'dtype': array.dtype.str,
+        'shape': list(array.shape),
+    }
+    meta_path = _orbit_meta_path(path)
+    tmp_path = f"{meta_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return meta
+
+def save_orbit(path, r, x0, n, chunk_size=DEFAULT_CHUNK_SIZE, dtype=np.float64):
+    """
+    把单条轨道分块直接写入内存映射的.npy文件
+
+    轨道不会整体驻留内存，适合生成GB级的长轨道。同时写入元数据文件
+    path + '.meta.json'。
+
+    参数:
+        path: 输出的.npy文件路径
+        r: 增长率参数
+        x0: 初始值
+        n: 迭代次数
+        chunk_size: 每块的长度
+        dtype: 浮点类型
+
+    返回:
+        meta: 元数据字典
+    """
+    orbit = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(n,))
+    pos = 0
+    for chunk in iter_logistic_chunks(r, x0, n, chunk_size, dtype=dtype):
+        orbit[pos:pos + len(chunk)] = chunk
+        pos += len(chunk)
+    orbit.flush()
+    meta = _write_orbit_meta(path, 'orbit', r, x0, orbit)
+    del orbit
+    return meta
+
+def save_orbit_batch(path, r, x0, n, dtype=np.float64):
+    """
+    把批量轨道矩阵直接写入内存映射的.npy文件
+
+    参数:
+        path: 输出的.npy文件路径
+        r: 增长率参数，标量或数组
+        x0: 初始值，标量或数组，需与r可广播
+        n: 迭代次数
+        dtype: 浮点类型
+
+    返回:
+        meta: 元数据字典
+    """
+    shape = np.broadcast_shapes(np.shape(r), np.shape(x0)) + (n,)
+    orbits = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=shape)
+    iterate_logistic_batch(r, x0, n, out=orbits, dtype=dtype)
+    orbits.flush()
+    meta = _write_orbit_meta(path, 'batch', r, x0, orbits)
+    del orbits
+    return meta
+
+def load_orbit(path, mode='r'):
+    """
+    以内存映射方式加载save_orbit/save_orbit_batch写出的轨道
+
+    返回的数组是文件的零拷贝视图，切片时只读入用到的部分。
+
+    参数:
+        path: .npy文件路径
+        mode: 内存映射模式，'r'只读，'r+'可写，'c'写时复制
+
+    返回:
+        orbit: 内存映射数组
+        meta: 元数据字典
+    """
+    orbit = np.load(path, mmap_mode=mode)
+    with open(_orbit_meta_path(path)) as f:
+        meta = json.load(f)
+    if list(orbit.shape) != meta['shape']:
+        raise ValueError(f"轨道文件与元数据不一致: {path}")
+    return orbit, meta
+
+def plot_time_series(r, x0, n, dtype=np.float64, ax=None):
     """
     绘制时间序列图
     
@@ -31,14 +305,16 @@ def plot_time_series(r, x0, n):
         r: 增长率参数
         x0: 初始值
         n: 迭代次数
+        dtype: 浮点类型
+        ax: 在给定的坐标轴上绘制，None时新建图像
         
     返回:
         fig: matplotlib图像对象
     """
-    x = iterate_logistic(r, x0, n)
+    x = iterate_logistic(r, x0, n, dtype=dtype)
     t = np.arange(n)
     
-    fig, ax = plt.subplots(figsize=(10, 6))
+    fig, ax = figure_axes(ax, figsize=(10, 6))
     ax.plot(t, x, 'b-', lw=1)
     ax.set_xlabel('迭代次数')
     ax.set_ylabel('x')
@@ -47,7 +323,368 @@ def plot_time_series(r, x0, n):
     
     return fig
 
-def plot_bifurcation(r_min, r_max, n_r, n_iterations, n_discard):
+def _logistic_step(r, x, out, tmp):
+    """
+    Logistic映射的单步数组迭代 out = r * x * (1 - x)
+
+    计算顺序与标量公式 r * x * (1 - x) 完全一致，保证逐位相同的结果；
+    所有中间量都写入预分配的缓冲区，不产生临时数组。
+
+    参数:
+        r: 增长率参数（标量或与x可广播的数组）
+        x: 当前迭代值数组
+        out: 输出数组（可以就是x本身）
+        tmp: 与x同形状的临时缓冲区
+
+    返回:
+        out: 下一步迭代值
+    """
+    np.subtract(1.0, x, out=tmp)
+    np.multiply(r, x, out=out)
+    np.multiply(out, tmp, out=out)
+    return out
+
+def _r_grid(r_min, r_max, n_r, dtype):
+    """在指定精度下生成等间距r网格"""
+    dtype = np.dtype(dtype)
+    return np.linspace(dtype.type(r_min), dtype.type(r_max), n_r, dtype=dtype)
+
+def _sweep_worker(kernel, r, shm_name, shape, dtype, order, start, stop, args):
+    """
+    进程池中执行的子任务：把kernel对r[start:stop]的结果写入共享内存
+    """
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        out = np.ndarray(shape, dtype=dtype, buffer=shm.buf, order=order)
+        kernel(r, out[start:stop], *args)
+        del out
+    finally:
+        shm.close()
+
+def _run_sweep(kernel, r, out, workers, *args):
+    """
+    对一维r网格执行扫描kernel，可选地拆分到多个进程
+
+    kernel(r, out, *args) 逐行计算r中每个值并写入out的对应行。多进程时
+    r网格按顺序切成连续的块，各进程直接写入共享内存中的输出缓冲区，
+    不通过pickle回传大数组。每个r值的计算互不依赖，因此结果与单进程
+    逐位相同。
+
+    参数:
+        kernel: 扫描核函数
+        r: 一维r值数组
+        out: 输出数组，第一维与r对应
+        workers: 进程数，None或1时在当前进程计算
+        *args: 传给kernel的其余参数
+
+    返回:
+        out: 输出数组
+    """
+    n_r = len(r)
+    if workers is None or workers <= 1 or n_r < 2:
+        kernel(r, out, *args)
+        return out
+
+    # 进程池只在多进程扫描时导入，避免拖慢模块导入
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import shared_memory
+
+    order = 'F' if out.flags.f_contiguous and not out.flags.c_contiguous else 'C'
+    shm = shared_memory.SharedMemory(create=True, size=max(out.nbytes, 1))
+    try:
+        shared = np.ndarray(out.shape, dtype=out.dtype, buffer=shm.buf, order=order)
+        bounds = np.linspace(0, n_r, min(workers, n_r) + 1).astype(int)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(_sweep_worker, kernel, r[start:stop], shm.name,
+                            out.shape, out.dtype.str, order, start, stop, args)
+                for start, stop in zip(bounds[:-1], bounds[1:])
+            ]
+            for future in futures:
+                future.result()
+        out[...] = shared
+        del shared
+    finally:
+        shm.close()
+        shm.unlink()
+    return out
+
+def _bifurcation_kernel(r, out, x0, n_discard):
+    """分岔图扫描核：out[i]为r[i]丢弃暂态后的轨道"""
+    tmp = np.empty(len(r), dtype=out.dtype)
+    current = out[:, 0]
+    current[:] = x0
+    for _ in range(n_discard):
+        _logistic_step(r, current, current, tmp)
+
+    for j in range(1, out.shape[1]):
+        _logistic_step(r, out[:, j - 1], out[:, j], tmp)
+
+def compute_bifurcation(r_min, r_max, n_r, n_iterations, n_discard, x0=0.5,
+                        workers=None, dtype=np.float64):
+    """
+    计算分岔图数据（所有r值同时向量化迭代）
+
+    参数:
+        r_min: r的最小值
+        r_max: r的最大值
+        n_r: r的取值个数
+        n_iterations: 每个r值的迭代次数
+        n_discard: 每个r值丢弃的初始迭代点数
+        x0: 初始值
+        workers: 并行进程数，None表示单进程
+        dtype: 浮点类型
+
+    返回:
+        r: 形状为(n_r,)的r值数组
+        x: 形状为(n_r, n_iterations - n_discard)的稳定后迭代值数组
+    """
+    n_keep = n_iterations - n_discard
+    if n_discard < 0 or n_keep <= 0:
+        raise ValueError("丢弃点数必须非负且小于迭代次数")
+
+    r = _r_grid(r_min, r_max, n_r, dtype)
+    # 列优先存储，使每一步写入的列在内存中连续
+    x = np.empty((n_r, n_keep), dtype=dtype, order='F')
+    _run_sweep(_bifurcation_kernel, r, x, workers, x0, n_discard)
+    return r, x
+
+def _density_kernel(r, out, x0, n_discard, n_keep, x_range):
+    """密度栅格扫描核：out[i]为r[i]稳定轨道在x分箱上的计数，按r的精度迭代"""
+    n_r, n_x_bins = out.shape
+    x_lo, x_hi = x_range
+    scale = n_x_bins / (x_hi - x_lo)
+
+    # 多出的最后一列收集超出范围的点，最后丢弃
+    counts = np.zeros((n_r, n_x_bins + 1), dtype=out.dtype)
+    rows = np.arange(n_r)
+    x = np.full(n_r, x0, dtype=r.dtype)
+    tmp = np.empty(n_r, dtype=r.dtype)
+    pos = np.empty(n_r, dtype=r.dtype)
+    idx = np.empty(n_r, dtype=np.intp)
+
+    for _ in range(n_discard):
+        _logistic_step(r, x, x, tmp)
+
+    for j in range(n_keep):
+        if j > 0:
+            _logistic_step(r, x, x, tmp)
+        np.subtract(x, x_lo, out=pos)
+        np.multiply(pos, scale, out=pos)
+        # 下溢截断到-1、上溢截断到n_x_bins，二者都落入溢出列
+        np.clip(pos, -1, n_x_bins, out=pos)
+        np.floor(pos, out=pos)
+        np.copyto(idx, pos, casting='unsafe')
+        counts[rows, idx] += 1
+
+    out[...] = counts[:, :n_x_bins]
+
+def compute_bifurcation_density(r_min, r_max, n_r, n_iterations, n_discard,
+                                x0=0.5, n_x_bins=1000, x_range=(0.0, 1.0),
+                                workers=None, dtype=np.float64):
+    """
+    计算分岔图的密度栅格（边迭代边统计直方图，不保存轨道点）
+
+    内存占用只与像素数 n_r × n_x_bins 有关，与迭代次数无关。
+
+    参数:
+        r_min: r的最小值
+        r_max: r的最大值
+        n_r: r的取值个数（即栅格的列数）
+        n_iterations: 每个r值的迭代次数
+        n_discard: 每个r值丢弃的初始迭代点数
+        x0: 初始值
+        n_x_bins: x方向的分箱数
+        x_range: x方向的统计范围，超出范围的点不计入
+        workers: 并行进程数，None表示单进程
+        dtype: 迭代使用的浮点类型
+
+    返回:
+        r: 形状为(n_r,)的r值数组
+        x_edges: 形状为(n_x_bins + 1,)的x分箱边界
+        counts: 形状为(n_r, n_x_bins)的计数数组
+    """
+    n_keep = n_iterations - n_discard
+    if n_discard < 0 or n_keep <= 0:
+        raise ValueError("丢弃点数必须非负且小于迭代次数")
+    if n_x_bins <= 0:
+        raise ValueError("分箱数必须为正整数")
+
+    r = _r_grid(r_min, r_max, n_r, dtype)
+    x_edges = np.linspace(x_range[0], x_range[1], n_x_bins + 1)
+    counts = np.empty((n_r, n_x_bins), dtype=np.uint32)
+    _run_sweep(_density_kernel, r, counts, workers, x0, n_discard, n_keep,
+               tuple(x_range))
+    return r, x_edges, counts
+
+class BifurcationTileStore:
+    """
+    分岔图密度栅格的四叉树瓦片缓存
+
+    (r, x)平面在第z层被划分为2^z × 2^z块瓦片，每块瓦片是tile_size × tile_size
+    的密度栅格。瓦片只计算一次并以.npy文件保存在缓存目录中，文件名由
+    (层级, 瓦片坐标, r范围, x范围, 迭代次数, 丢弃点数, 初始值, 瓦片尺寸, 浮点类型)
+    确定，不同设置的瓦片库可以共用一个缓存目录。平移和缩放
+    时只计算缺失的瓦片；同一r列中缺失的瓦片共用一次轨道迭代。
+    """
+
+    def __init__(self, cache_dir, n_iterations, n_discard, x0=0.5, tile_size=256,
+                 r_range=(0.0, 4.0), x_range=(0.0, 1.0), workers=None,
+                 dtype=np.float64):
+        """
+        参数:
+            cache_dir: 瓦片缓存目录，不存在时自动创建
+            n_iterations: 每个r值的迭代次数
+            n_discard: 每个r值丢弃的初始迭代点数
+            x0: 初始值
+            tile_size: 瓦片边长（像素）
+            r_range: 第0层瓦片覆盖的r范围
+            x_range: 第0层瓦片覆盖的x范围
+            workers: 计算瓦片时的并行进程数
+            dtype: 迭代使用的浮点类型
+        """
+        if n_discard < 0 or n_iterations - n_discard <= 0:
+            raise ValueError("丢弃点数必须非负且小于迭代次数")
+        self.cache_dir = cache_dir
+        self.n_iterations = n_iterations
+        self.n_discard = n_discard
+        self.x0 = x0
+        self.tile_size = tile_size
+        self.r_range = tuple(r_range)
+        self.x_range = tuple(x_range)
+        self.workers = workers
+        self.dtype = np.dtype(dtype)
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def tile_path(self, z, i, j):
+        """瓦片(z, i, j)的缓存文件路径"""
+        (r_lo, r_hi), (x_lo, x_hi) = self.r_range, self.x_range
+        name = (f"z{z}_i{i}_j{j}_r{r_lo!r}-{r_hi!r}_x{x_lo!r}-{x_hi!r}"
+                f"_n{self.n_iterations}_d{self.n_discard}"
+                f"_x0{self.x0!r}_t{self.tile_size}_{self.dtype.name}.npy")
+        return os.path.join(self.cache_dir, name)
+
+    def tile_bounds(self, z, i, j):
+        """
+        瓦片(z, i, j)覆盖的范围
+
+        返回:
+            (r0, r1, x0, x1)
+        """
+        n = 2 ** z
+        r_lo, r_hi = self.r_range
+        x_lo, x_hi = self.x_range
+        dr = (r_hi - r_lo) / n
+        dx = (x_hi - x_lo) / n
+        return r_lo + i * dr, r_lo + (i + 1) * dr, x_lo + j * dx, x_lo + (j + 1) * dx
+
+    def zoom_for(self, r_min, r_max, n_r):
+        """选择像素宽度不超过 (r_max - r_min) / n_r 的最浅层级"""
+        pixels = (self.r_range[1] - self.r_range[0]) / (r_max - r_min) * n_r
+        return max(0, int(np.ceil(np.log2(pixels / self.tile_size))))
+
+    def _compute_column(self, z, i, rows):
+        """计算第i列中rows所列各瓦片，保存后返回 {j: counts}"""
+        t = self.tile_size
+        r0, r1, _, _ = self.tile_bounds(z, i, 0)
+        dr = (r1 - r0) / t
+        r = _r_grid(r0 + dr / 2, r1 - dr / 2, t, self.dtype)
+
+        # 一次迭代覆盖从最低到最高的所需瓦片行
+        j_lo, j_hi = min(rows), max(rows)
+        x_lo = self.tile_bounds(z, i, j_lo)[2]
+        x_hi = self.tile_bounds(z, i, j_hi)[3]
+        counts = np.empty((t, (j_hi - j_lo + 1) * t), dtype=np.uint32)
+        _run_sweep(_density_kernel, r, counts, self.workers, self.x0, self.n_discard,
+                   self.n_iterations - self.n_discard, (x_lo, x_hi))
+
+        tiles = {}
+        for j in rows:
+            tile = np.ascontiguousarray(counts[:, (j - j_lo) * t:(j - j_lo + 1) * t])
+            path = self.tile_path(z, i, j)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.save(f, tile)
+            os.replace(tmp_path, path)
+            tiles[j] = tile
+        return tiles
+
+    def get_tiles(self, z, tile_indices):
+        """
+        读取一组瓦片，缺失的瓦片按列批量计算并写入缓存
+
+        参数:
+            z: 层级
+            tile_indices: (i, j)瓦片坐标的可迭代对象
+
+        返回:
+            tiles: {(i, j): 形状为(tile_size, tile_size)的计数数组}，
+                   第一维对应r，第二维对应x
+        """
+        tiles = {}
+        missing = {}
+        for i, j in tile_indices:
+            path = self.tile_path(z, i, j)
+            if os.path.exists(path):
+                tiles[i, j] = np.load(path)
+            else:
+                missing.setdefault(i, []).append(j)
+        for i, rows in missing.items():
+            for j, tile in self._compute_column(z, i, rows).items():
+                tiles[i, j] = tile
+        return tiles
+
+    def get_tile(self, z, i, j):
+        """读取单块瓦片"""
+        return self.get_tiles(z, [(i, j)])[i, j]
+
+    def render(self, r_min, r_max, x_min, x_max, n_r):
+        """
+        拼接覆盖给定视窗的瓦片
+
+        参数:
+            r_min, r_max: 视窗的r范围
+            x_min, x_max: 视窗的x范围
+            n_r: 视窗在r方向上希望达到的像素数，用于选择层级
+
+        返回:
+            counts: 形状为(r像素数, x像素数)的计数数组
+            extent: (r0, r1, x0, x1)，counts实际覆盖的范围（按像素边界对齐）
+        """
+        z = self.zoom_for(r_min, r_max, n_r)
+        n = 2 ** z
+        t = self.tile_size
+        r_lo, r_hi = self.r_range
+        x_lo, x_hi = self.x_range
+        r_pix = (r_hi - r_lo) / (n * t)
+        x_pix = (x_hi - x_lo) / (n * t)
+
+        # 视窗在该层全局像素坐标中的范围
+        pr0 = max(0, int(np.floor((r_min - r_lo) / r_pix)))
+        pr1 = min(n * t, int(np.ceil((r_max - r_lo) / r_pix)))
+        px0 = max(0, int(np.floor((x_min - x_lo) / x_pix)))
+        px1 = min(n * t, int(np.ceil((x_max - x_lo) / x_pix)))
+        if pr1 <= pr0 or px1 <= px0:
+            raise ValueError("视窗与瓦片范围没有交集")
+
+        i0, i1 = pr0 // t, (pr1 - 1) // t
+        j0, j1 = px0 // t, (px1 - 1) // t
+        tiles = self.get_tiles(z, [(i, j) for i in range(i0, i1 + 1)
+                                   for j in range(j0, j1 + 1)])
+        mosaic = np.empty(((i1 - i0 + 1) * t, (j1 - j0 + 1) * t), dtype=np.uint32)
+        for (i, j), tile in tiles.items():
+            mosaic[(i - i0) * t:(i - i0 + 1) * t, (j - j0) * t:(j - j0 + 1) * t] = tile
+
+        counts = mosaic[pr0 - i0 * t:pr1 - i0 * t, px0 - j0 * t:px1 - j0 * t]
+        extent = (r_lo + pr0 * r_pix, r_lo + pr1 * r_pix,
+                  x_lo + px0 * x_pix, x_lo + px1 * x_pix)
+        return counts, extent
+
+def plot_bifurcation(r_min, r_max, n_r, n_iterations, n_discard,
+                     mode='points', n_x_bins=None, workers=None, cache_dir=None,
+                     dtype=np.float64, ax=None):
     """
     绘制分岔图
     
@@ -57,28 +694,311 @@ def plot_bifurcation(r_min, r_max, n_r, n_iterations, n_discard):
         n_r: r的取值个数
         n_iterations: 每个r值的迭代次数
         n_discard: 每个r值丢弃的初始迭代点数
+        mode: 'points'逐点绘制，'density'绘制密度栅格
+        n_x_bins: 密度模式下x方向的分箱数，默认1000
+        workers: 并行进程数，None表示单进程
+        cache_dir: 密度模式下的瓦片缓存目录，给定时从BifurcationTileStore
+                   读取栅格，只计算缺失的瓦片；x方向分辨率由瓦片层级决定，
+                   不能同时指定n_x_bins
+        dtype: 迭代使用的浮点类型
+        ax: 在给定的坐标轴上绘制，None时新建图像
         
     返回:
         fig: matplotlib图像对象
     """
-    r = np.linspace(r_min, r_max, n_r)
-    x = np.zeros(n_iterations)
-    x_plot = []
-    r_plot = []
-    
-    for r_val in r:
-        x[0] = 0.5
-        for i in range(1, n_iterations):
-            x[i] = r_val * x[i-1] * (1 - x[i-1])
-        
-        # 只保留稳定后的点
-        x_plot.extend(x[n_discard:])
-        r_plot.extend([r_val] * (n_iterations - n_discard))
+    if mode not in ('points', 'density'):
+        raise ValueError(f"未知的绘图模式: {mode}")
+    if mode == 'density' and cache_dir is not None and n_x_bins is not None:
+        raise ValueError("使用瓦片缓存时x方向分辨率由瓦片决定，不能指定n_x_bins")
+
+    fig, ax = figure_axes(ax, figsize=(12, 8))
+    if mode == 'density' and cache_dir is not None:
+        store = BifurcationTileStore(cache_dir, n_iterations, n_discard,
+                                     workers=workers, dtype=dtype)
+        counts, extent = store.render(r_min, r_max, 0.0, 1.0, n_r)
+        draw_bifurcation(ax, counts=counts, extent=extent)
+    elif mode == 'density':
+        r, x_edges, counts = compute_bifurcation_density(
+            r_min, r_max, n_r, n_iterations, n_discard,
+            n_x_bins=1000 if n_x_bins is None else n_x_bins,
+            workers=workers, dtype=dtype)
+        draw_bifurcation(ax, counts=counts, extent=(r[0], r[-1], x_edges[0], x_edges[-1]))
+    else:
+        r, x = compute_bifurcation(r_min, r_max, n_r, n_iterations, n_discard,
+                                   workers=workers, dtype=dtype)
+        draw_bifurcation(ax, r=r, x=x)
     
-    fig, ax = plt.subplots(figsize=(12, 8))
-    ax.plot(r_plot, x_plot, ',k', alpha=0.1, markersize=0.1)
+    return fig
+
+def draw_bifurcation(ax, r=None, x=None, counts=None, extent=None):
+    """
+    在坐标轴上绘制已计算好的分岔图数据
+
+    参数:
+        ax: matplotlib坐标轴
+        r, x: 逐点模式的数据，compute_bifurcation的返回值
+        counts, extent: 密度模式的计数栅格（第一维对应r）和覆盖范围(r0, r1, x0, x1)
+    """
+    if counts is not None:
+        ax.imshow(np.log1p(counts.T), origin='lower', aspect='auto',
+                  cmap='gray_r', interpolation='nearest', extent=extent)
+    elif r is not None and x is not None:
+        r_plot = np.broadcast_to(r[:, np.newaxis], x.shape)
+        ax.plot(r_plot.ravel(), x.ravel(), ',k', alpha=0.1, markersize=0.1)
+    else:
+        raise ValueError("需要提供(r, x)或(counts, extent)")
     ax.set_xlabel('r')
     ax.set_ylabel('x')
     ax.set_title('Logistic映射分岔图')
+
+def _lyapunov_kernel(r, out, x0, n_transient, n_average):
+    """Lyapunov指数扫描核：out[i]为r[i]的λ"""
+    x = np.full(len(r), x0, dtype=r.dtype)
+    tmp = np.empty(len(r), dtype=r.dtype)
+    deriv = np.empty(len(r), dtype=r.dtype)
+    total = np.zeros(len(r), dtype=r.dtype)
+
+    for _ in range(n_transient):
+        _logistic_step(r, x, x, tmp)
+
+    # x恰为0.5时导数为零，log给出-inf，属于超稳定轨道的正确极限
+    with np.errstate(divide='ignore'):
+        for k in range(n_average):
+            if k > 0:
+                _logistic_step(r, x, x, tmp)
+            np.multiply(x, 2.0, out=deriv)
+            np.subtract(1.0, deriv, out=deriv)
+            np.multiply(r, deriv, out=deriv)
+            np.abs(deriv, out=deriv)
+            np.log(deriv, out=deriv)
+            total += deriv
+
+    np.divide(total, n_average, out=out)
+
+def lyapunov_spectrum(r_values, x0, n_transient, n_average, workers=None,
+                      dtype=np.float64):
+    """
+    计算一组r值的Lyapunov指数（所有r值同时向量化迭代）
+
+    λ(r) = <log|r(1-2x)|>，对丢弃暂态后的n_average个轨道点取平均。
+    λ < 0 对应稳定的不动点或周期轨道，λ > 0 对应混沌。
+
+    参数:
+        r_values: r值数组
+        x0: 初始值
+        n_transient: 丢弃的暂态迭代次数
+        n_average: 参与平均的迭代次数
+        workers: 并行进程数，None表示单进程
+        dtype: 浮点类型
+
+    返回:
+        lam: 与r_values同形状的Lyapunov指数数组
+    """
+    if n_transient < 0 or n_average <= 0:
+        raise ValueError("暂态次数必须非负，平均次数必须为正")
+
+    r = np.asarray(r_values, dtype=dtype)
+    lam = np.empty(r.size, dtype=dtype)
+    _run_sweep(_lyapunov_kernel, r.ravel(), lam, workers, x0, n_transient, n_average)
+    return lam.reshape(r.shape)
+
+def plot_lyapunov(r_min, r_max, n_r, n_transient, n_average, workers=None,
+                  dtype=np.float64, ax=None):
+    """
+    绘制Lyapunov指数随r的变化曲线
+    
+    参数:
+        r_min: r的最小值
+        r_max: r的最大值
+        n_r: r的取值个数
+        n_transient: 丢弃的暂态迭代次数
+        n_average: 参与平均的迭代次数
+        workers: 并行进程数，None表示单进程
+        dtype: 浮点类型
+        ax: 在给定的坐标轴上绘制，None时新建图像
+        
+    返回:
+        fig: matplotlib图像对象
+    """
+    r = _r_grid(r_min, r_max, n_r, dtype)
+    lam = lyapunov_spectrum(r, 0.5, n_transient, n_average, workers=workers,
+                            dtype=dtype)
     
-    return fig
\ No newline at end of file
+    fig, ax = figure_axes(ax, figsize=(12, 6))
+    ax.plot(r, lam, 'b-', lw=0.5)
+    ax.axhline(0, color='r', lw=1)
+    ax.set_xlabel('r')
+    ax.set_ylabel('λ')
+    ax.set_title('Logistic映射Lyapunov指数')
+    ax.grid(True)
+    
+    return fig
+
+def _period_kernel(r, out, x0, n_transient, max_period, tol):
+    """周期检测扫描核：out[i]为r[i]吸引子的周期"""
+    x = np.full(len(r), x0, dtype=r.dtype)
+    tmp = np.empty(len(r), dtype=r.dtype)
+    for _ in range(n_transient):
+        _logistic_step(r, x, x, tmp)
+
+    tail = iterate_logistic_batch(r, x, 2 * max_period, dtype=r.dtype)
+    out[...] = 0
+    undecided = np.ones(len(r), dtype=bool)
+    for p in range(1, max_period + 1):
+        candidate = undecided & (np.abs(tail[:, p] - tail[:, 0]) < tol)
+        if not candidate.any():
+            continue
+        idx = np.nonzero(candidate)[0]
+        window = tail[idx, :2 * p]
+        ok = np.all(np.abs(window[:, p:] - window[:, :p]) < tol, axis=-1)
+        out[idx[ok]] = p
+        undecided[idx[ok]] = False
+
+def detect_period(r_values, x0, n_transient, max_period, tol=1e-6, workers=None,
+                  dtype=np.float64):
+    """
+    批量检测吸引子的周期
+
+    丢弃暂态后迭代2*max_period个点，对每个r寻找最小的p，使得尾部相隔p的
+    点在容差内重合。先用单点比较快速筛选候选，再对候选检查整个周期窗口。
+
+    参数:
+        r_values: r值数组
+        x0: 初始值
+        n_transient: 丢弃的暂态迭代次数
+        max_period: 检测的最大周期
+        tol: 判定重合的绝对容差
+        workers: 并行进程数，None表示单进程
+        dtype: 浮点类型
+
+    返回:
+        period: 与r_values同形状的整数数组，未找到周期（混沌或未收敛）时为0
+    """
+    if max_period <= 0:
+        raise ValueError("最大周期必须为正整数")
+
+    r = np.asarray(r_values, dtype=dtype)
+    period = np.empty(r.size, dtype=int)
+    _run_sweep(_period_kernel, r.ravel(), period, workers, x0, n_transient,
+               max_period, tol)
+    return period.reshape(r.shape)
+
+# Feigenbaum常数的近似值，仅用于外推初始猜测
+_FEIGENBAUM_DELTA = 4.669
+
+def _superstable_parameters(n_levels, tol=1e-14, max_newton=50):
+    """
+    用牛顿法计算超稳定参数R_0, ..., R_n（x=0.5位于2^n周期轨道上）
+
+    G(r) = f_r^(2^n)(0.5) - 0.5，dG/dr 与轨道同步递推得到。
+
+    参数:
+        n_levels: 最高层级n
+        tol: 牛顿迭代的收敛容差
+        max_newton: 每层的最大牛顿迭代次数
+
+    返回:
+        R: 长度为n_levels+1的数组
+    """
+    R = [2.0, 1.0 + np.sqrt(5.0)]
+    for n in range(2, n_levels + 1):
+        r = R[-1] + (R[-1] - R[-2]) / _FEIGENBAUM_DELTA
+        for _ in range(max_newton):
+            x, dx = 0.5, 0.0
+            for _ in range(2 ** n):
+                x, dx = r * x * (1 - x), x * (1 - x) + r * (1 - 2 * x) * dx
+            step = (x - 0.5) / dx
+            r -= step
+            if abs(step) < tol:
+                break
+        R.append(r)
+    return np.array(R[:n_levels + 1])
+
+def _cycle_multiplier(r, x, period, tol=1e-12, max_newton=50):
+    """
+    用牛顿法求解周期为period的轨道点，并返回其乘子
+
+    对不稳定的周期轨道同样有效，适合从邻近参数的轨道点热启动。
+
+    参数:
+        r: 增长率参数
+        x: 轨道点的初始猜测
+        period: 周期
+        tol: 牛顿迭代的收敛容差
+        max_newton: 最大牛顿迭代次数
+
+    返回:
+        x: 周期轨道上的一点
+        multiplier: 轨道乘子 Π r(1-2x_i)
+    """
+    last_step = np.inf
+    for _ in range(max_newton):
+        y, multiplier = x, 1.0
+        for _ in range(period):
+            multiplier *= r * (1 - 2 * y)
+            y = r * y * (1 - y)
+        step = (y - x) / (multiplier - 1)
+        x -= step
+        # 受舍入误差限制时步长不再减小，此时也视为收敛
+        if abs(step) < tol or abs(step) >= last_step:
+            break
+        last_step = abs(step)
+    return x, multiplier
+
+def locate_period_doubling(n_levels, tol=1e-13):
+    """
+    二分法精确定位倍周期分岔点r_1, r_2, ..., 并估计Feigenbaum常数δ
+
+    分岔点r_k处2^(k-1)周期轨道的乘子为-1。r_k位于超稳定参数R_(k-1)与R_k
+    之间，在R_(k-1)处x=0.5恰为轨道点，二分时每一步都用最近一次求得的
+    轨道点热启动牛顿迭代，避免重新计算暂态。
+
+    参数:
+        n_levels: 需要定位的分岔点个数
+        tol: 二分区间的终止宽度
+
+    返回:
+        r_points: 长度为n_levels的分岔点数组
+        delta: 长度为n_levels-2的Feigenbaum常数估计
+               δ_k = (r_k - r_(k-1)) / (r_(k+1) - r_k)
+    """
+    R = _superstable_parameters(n_levels)
+    r_points = np.empty(n_levels)
+    for k in range(1, n_levels + 1):
+        period = 2 ** (k - 1)
+        lo, hi = R[k - 1], R[k]
+        x_cached = 0.5
+        while hi - lo > tol:
+            mid = 0.5 * (lo + hi)
+            x_cached, multiplier = _cycle_multiplier(mid, x_cached, period)
+            if multiplier > -1:
+                lo = mid
+            else:
+                hi = mid
+        r_points[k - 1] = 0.5 * (lo + hi)
+
+    delta = (r_points[1:-1] - r_points[:-2]) / (r_points[2:] - r_points[1:-1])
+    return r_points, delta
+
+def precision_horizon(r_values, x0, n, dtype, tol=1e-3):
+    """
+    估计某一浮点类型下混沌轨道保持可信的迭代步数
+
+    以np.longdouble轨道为参考，返回dtype轨道与参考轨道之差首次超过tol的
+    迭代步数。注意在np.longdouble与float64相同的平台上参考轨道不比
+    float64更精确。
+
+    参数:
+        r_values: r值，标量或数组
+        x0: 初始值
+        n: 迭代次数
+        dtype: 待评估的浮点类型
+        tol: 判定偏离的绝对容差
+
+    返回:
+        steps: 与r_values同形状的整数数组，全程未偏离时为n
+    """
+    reference = iterate_logistic_batch(r_values, x0, n, dtype=np.longdouble)
+    x = iterate_logistic_batch(r_values, x0, n, dtype=dtype)
+    diverged = np.abs(x.astype(np.longdouble) - reference) > tol
+    return np.where(diverged.any(axis=-1), diverged.argmax(axis=-1), n)
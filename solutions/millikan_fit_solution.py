@@ -3,50 +3,217 @@
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
+
+from solutions.data_io import iter_chunks, load_columns
+from solutions.plotting import figure_axes, show
+from solutions.robust_fit import fit_line
 
 def load_data(filename):
     """
     加载数据文件
     """
     try:
-        data = np.loadtxt(filename)
-        return data[:, 0], data[:, 1]
+        return load_columns(filename)
     except Exception as e:
         raise FileNotFoundError(f"无法加载文件: {filename}") from e
 
-def calculate_parameters(x, y):
+def design_condition_number(Ex, var, Exx):
+    """
+    设计矩阵 [x, 1] 列归一化后的2-范数条件数
+
+    归一化后的Gram矩阵为 [[1, ρ], [ρ, 1]]，ρ = |Ex| / sqrt(Exx)，条件数为
+    (1 + ρ) / sqrt(1 - ρ^2)，其中 1 - ρ^2 = var / Exx 直接用方差计算以避免相消。
+    条件数与x的单位无关，量级约为 |Ex| / std(x)；其平方表示直接解正规方程时
+    相对误差的放大倍数。
+    """
+    if not var > 0:
+        return np.inf
+    rho = abs(Ex) / np.sqrt(Exx)
+    return float((1 + rho) / np.sqrt(var / Exx))
+
+# 稳定算法分块累加时每块的点数
+FIT_CHUNK_SIZE = 1 << 20
+
+def calculate_parameters(x, y, solver='centered', dtype=np.float64, return_condition=False):
     """
     计算最小二乘拟合参数
+
+    参数:
+        x, y: 数据数组
+        solver: 'centered'按块累加离差平方和（单遍、数值稳定，见LinearFitAccumulator），
+                'lstsq'对设计矩阵[x, 1]用np.linalg.lstsq求解，
+                'normal'为原始的 Exx - Ex^2 正规方程公式（x的均值远大于离散程度时
+                会损失有效数字）
+        dtype: 'centered'累加使用的浮点类型，例如np.longdouble
+        return_condition: 为True时在结果末尾附加设计矩阵的条件数
+
+    返回:
+        (m, c, Ex, Ey, Exx, Exy)，return_condition为True时为
+        (m, c, Ex, Ey, Exx, Exy, cond)
     """
     if len(x) == 0 or len(y) == 0:
         raise ValueError("输入数据不能为空")
     if len(x) != len(y):
         raise ValueError("x和y数组长度必须相同")
-    
-    N = len(x)
-    Ex = np.mean(x)
-    Ey = np.mean(y)
-    Exx = np.mean(x**2)
-    Exy = np.mean(x*y)
-    
-    denominator = Exx - Ex**2
-    if denominator == 0:
-        raise ValueError("无法计算参数，分母为零")
-    
-    m = (Exy - Ex*Ey) / denominator
-    c = (Exx*Ey - Ex*Exy) / denominator
-    
-    return m, c, Ex, Ey, Exx, Exy
 
-def plot_data_and_fit(x, y, m, c):
+    if solver == 'centered':
+        accumulator = LinearFitAccumulator(dtype)
+        for start in range(0, len(x), FIT_CHUNK_SIZE):
+            accumulator.update(x[start:start + FIT_CHUNK_SIZE], y[start:start + FIT_CHUNK_SIZE])
+        result = accumulator.result()
+        cond = accumulator.condition_number()
+    elif solver in ('lstsq', 'normal'):
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        Ex = np.mean(x)
+        Ey = np.mean(y)
+        Exx = np.mean(x**2)
+        Exy = np.mean(x*y)
+        if solver == 'normal':
+            denominator = Exx - Ex**2
+            if denominator == 0:
+                raise ValueError("无法计算参数，分母为零")
+            m = (Exy - Ex*Ey) / denominator
+            c = (Exx*Ey - Ex*Exy) / denominator
+            cond = design_condition_number(Ex, denominator, Exx)
+        else:
+            # 列归一化后求解，避免x的量级使秩判断失效
+            scale = np.sqrt(Exx)
+            design = np.column_stack([x / scale, np.ones_like(x)])
+            (m, c), _, rank, sv = np.linalg.lstsq(design, y, rcond=np.finfo(float).eps)
+            if rank < 2:
+                raise ValueError("无法计算参数，分母为零")
+            m = m / scale
+            cond = sv[0] / sv[-1]
+        result = tuple(float(v) for v in (m, c, Ex, Ey, Exx, Exy))
+    else:
+        raise ValueError(f"未知的求解方法: {solver}")
+
+    if return_condition:
+        return result + (float(cond),)
+    return result
+
+class LinearFitAccumulator:
+    """
+    流式最小二乘直线拟合累加器
+
+    保存点数、均值以及离差平方和 Σ(x-x̄)²、Σ(x-x̄)(y-ȳ)、Σ(y-ȳ)²，
+    按Welford/Chan的合并公式更新，避免 E[x²] - E[x]² 式的相消误差。
+    数据可以分块送入，不同进程中的累加器可以用merge合并，内存占用为O(1)。
+
+    参数:
+        dtype: 累加使用的浮点类型，例如np.longdouble
+    """
+
+    def __init__(self, dtype=np.float64):
+        self.dtype = np.dtype(dtype)
+        zero = self.dtype.type(0)
+        self.n = 0
+        self.mean_x = zero
+        self.mean_y = zero
+        self.sxx = zero
+        self.sxy = zero
+        self.syy = zero
+
+    def _combine(self, n, mean_x, mean_y, sxx, sxy, syy):
+        """按Chan的并行公式合并一组汇总量"""
+        if n == 0:
+            return
+        total = self.n + n
+        dx = mean_x - self.mean_x
+        dy = mean_y - self.mean_y
+        weight = self.n * n / total
+        self.sxx += sxx + dx * dx * weight
+        self.sxy += sxy + dx * dy * weight
+        self.syy += syy + dy * dy * weight
+        self.mean_x += dx * n / total
+        self.mean_y += dy * n / total
+        self.n = total
+
+    def update(self, x_chunk, y_chunk):
+        """
+        加入一块数据
+
+        块内的均值和离差平方和向量化计算，再与已有汇总量合并。
+        """
+        x = np.asarray(x_chunk, dtype=self.dtype).ravel()
+        y = np.asarray(y_chunk, dtype=self.dtype).ravel()
+        if len(x) != len(y):
+            raise ValueError("x和y数组长度必须相同")
+        if len(x) == 0:
+            return self
+        n = len(x)
+        mean_x = x.mean()
+        mean_y = y.mean()
+        dx = x - mean_x
+        dy = y - mean_y
+        # 修正两遍算法：均值本身的舍入误差由离差之和补偿
+        ex = dx.sum()
+        ey = dy.sum()
+        self._combine(n, mean_x + ex / n, mean_y + ey / n, dx @ dx - ex * ex / n,
+                      dx @ dy - ex * ey / n, dy @ dy - ey * ey / n)
+        return self
+
+    def merge(self, other):
+        """合并另一个累加器（例如另一个进程处理的数据分片）"""
+        self._combine(other.n, other.mean_x, other.mean_y, other.sxx, other.sxy, other.syy)
+        return self
+
+    def result(self):
+        """
+        计算拟合结果
+
+        返回:
+            与calculate_parameters相同的元组 (m, c, Ex, Ey, Exx, Exy)
+        """
+        if self.n == 0:
+            raise ValueError("输入数据不能为空")
+        if self.sxx == 0:
+            raise ValueError("无法计算参数，分母为零")
+        m = self.sxy / self.sxx
+        c = self.mean_y - m * self.mean_x
+        Exx = self.sxx / self.n + self.mean_x ** 2
+        Exy = self.sxy / self.n + self.mean_x * self.mean_y
+        return tuple(float(v) for v in (m, c, self.mean_x, self.mean_y, Exx, Exy))
+
+    def condition_number(self):
+        """设计矩阵 [x, 1] 列归一化后的条件数，见design_condition_number"""
+        if self.n == 0:
+            return np.inf
+        var = self.sxx / self.n
+        return design_condition_number(self.mean_x, var, var + self.mean_x ** 2)
+
+def stream_fit_file(filename, chunk_rows=1_000_000):
+    """
+    分块读取两列数据文件并做流式直线拟合
+
+    参数:
+        filename: 数据文件路径，格式同load_data
+        chunk_rows: 每块读取的行数
+
+    返回:
+        与calculate_parameters相同的元组 (m, c, Ex, Ey, Exx, Exy)
+    """
+    accumulator = LinearFitAccumulator()
+    try:
+        chunks = iter_chunks(filename, chunk_rows)
+        first = next(chunks, None)
+    except OSError as e:
+        raise FileNotFoundError(f"无法加载文件: {filename}") from e
+    if first is not None:
+        accumulator.update(first[:, 0], first[:, 1])
+    for data in chunks:
+        accumulator.update(data[:, 0], data[:, 1])
+    return accumulator.result()
+
+def plot_data_and_fit(x, y, m, c, ax=None):
     """
-    绘制数据点和拟合直线
+    绘制数据点和拟合直线；给定ax时在其上绘制
     """
     if np.isnan(m) or np.isnan(c):
         raise ValueError("斜率和截距不能为NaN")
     
-    fig, ax = plt.subplots()
+    fig, ax = figure_axes(ax)
     ax.scatter(x, y, label='实验数据')
     y_fit = m*x + c
     ax.plot(x, y_fit, 'r', label='拟合直线')
@@ -98,7 +265,7 @@ def main():
         
         # 保存图像
         fig.savefig("millikan_fit.png", dpi=300)
-        plt.show()
+        show()
         
     except Exception as e:
         print(f"程序出错: {str(e)}")
@@ -0,0 +1,66 @@
+"""
+绘图层的延迟导入（解决方案）
+
+计算模块不在导入时加载matplotlib，只在绘图函数内部通过pyplot()取得
+matplotlib.pyplot。没有图形界面时（例如批处理进程或CI）先切换到非交互的
+Agg后端，避免加载GUI后端。
+"""
+
+import os
+import sys
+
+HEADLESS_BACKEND = 'Agg'
+
+def is_headless():
+    """
+    判断当前进程是否没有可用的图形界面
+
+    设置了MPLBACKEND环境变量时以用户的选择为准；Linux等系统上没有
+    DISPLAY和WAYLAND_DISPLAY时视为无界面。
+
+    返回:
+        headless: 是否无界面
+    """
+    if os.environ.get('MPLBACKEND'):
+        return False
+    if sys.platform in ('win32', 'darwin'):
+        return False
+    return not (os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+
+def pyplot():
+    """
+    导入并返回matplotlib.pyplot
+
+    首次导入时若无图形界面，则强制使用Agg后端。
+
+    返回:
+        plt: matplotlib.pyplot模块
+    """
+    if 'matplotlib.pyplot' not in sys.modules and is_headless():
+        import matplotlib
+        matplotlib.use(HEADLESS_BACKEND)
+    import matplotlib.pyplot as plt
+    return plt
+
+def figure_axes(ax=None, figsize=None):
+    """
+    取得绘图用的图像和坐标轴
+
+    参数:
+        ax: 已有的坐标轴，给定时直接在其上绘制（例如复用的图像）
+        figsize: 新建图像的尺寸
+
+    返回:
+        fig: 图像对象
+        ax: 坐标轴对象
+    """
+    if ax is not None:
+        return ax.figure, ax
+    return pyplot().subplots(figsize=figsize)
+
+def show():
+    """显示当前图像；非交互后端下不做任何事"""
+    plt = pyplot()
+    import matplotlib
+    if matplotlib.get_backend().lower() != HEADLESS_BACKEND.lower():
+        plt.show()
@@ -0,0 +1,344 @@
+"""
+直线拟合的加权与稳健回归（解决方案）
+
+fit_line统一提供普通最小二乘、加权最小二乘、Huber/Tukey迭代重加权最小二乘
+(IRLS)以及Theil–Sen估计，均返回斜率、截距及其标准误差。
+"""
+
+import numpy as np
+
+# IRLS的调节常数，对正态误差分别有95%的渐近效率
+HUBER_K = 1.345
+TUKEY_K = 4.685
+
+# 斜率对数不超过该值时Theil–Sen直接枚举全部点对
+THEIL_SEN_BRUTE_PAIRS = 4_000_000
+# Theil–Sen随机选择每轮抽样的点对数
+THEIL_SEN_SAMPLE = 4_000_000
+# Theil–Sen随机选择的最大轮数，超过后直接枚举区间内的点对
+THEIL_SEN_MAX_ROUNDS = 64
+
+def _weighted_line(x, y, w):
+    """
+    加权最小二乘直线拟合（离差形式）
+
+    返回:
+        m, c: 斜率和截距
+        x_mean: 加权均值
+        sxx: 加权离差平方和 Σw(x - x̄)²
+        w_sum: 权重之和
+    """
+    w_sum = w.sum()
+    x_mean = (w @ x) / w_sum
+    y_mean = (w @ y) / w_sum
+    dx = x - x_mean
+    wdx = w * dx
+    sxx = wdx @ dx
+    if not sxx > 0:
+        raise ValueError("无法计算参数，分母为零")
+    m = (wdx @ (y - y_mean)) / sxx
+    return m, y_mean - m * x_mean, x_mean, sxx, w_sum
+
+def _line_errors(scale2, x_mean, sxx, w_sum):
+    """由残差方差和加权离差平方和计算斜率、截距的标准误差"""
+    m_err = np.sqrt(scale2 / sxx)
+    c_err = np.sqrt(scale2 * (1 / w_sum + x_mean ** 2 / sxx))
+    return m_err, c_err
+
+def _mad_scale(r):
+    """残差的MAD尺度估计，对正态误差是标准差的一致估计"""
+    return 1.4826 * np.median(np.abs(r))
+
+def _irls(x, y, prior, method, max_iter, tol):
+    """Huber或Tukey权函数的迭代重加权最小二乘"""
+    sqrt_prior = np.sqrt(prior)
+    m, c, x_mean, sxx, w_sum = _weighted_line(x, y, prior)
+    if method == 'tukey':
+        # 再下降型权函数需要稳健的起点，先做Huber拟合
+        m, c, *_ = _irls(x, y, prior, 'huber', max_iter, tol)
+
+    k = HUBER_K if method == 'huber' else TUKEY_K
+    scale = 0.0
+    for _ in range(max_iter):
+        r = (y - m * x - c) * sqrt_prior
+        scale = _mad_scale(r)
+        if scale == 0:
+            break
+        u = np.abs(r) / (k * scale)
+        if method == 'huber':
+            w = np.minimum(1.0, 1.0 / np.maximum(u, 1e-300))
+        else:
+            w = np.where(u < 1, (1 - u * u) ** 2, 0.0)
+        m_new, c_new, *_ = _weighted_line(x, y, prior * w)
+        done = (abs(m_new - m) <= tol * (abs(m) + tol)
+                and abs(c_new - c) <= tol * (abs(c) + tol))
+        m, c = m_new, c_new
+        if done:
+            break
+
+    # M估计的渐近协方差: s² E[ψ²]/E[ψ']² (X^T W X)^-1，W为先验权重
+    u = (y - m * x - c) * sqrt_prior / scale if scale > 0 else np.zeros_like(x)
+    if method == 'huber':
+        psi = np.clip(u, -k, k)
+        dpsi = (np.abs(u) <= k).astype(float)
+    else:
+        v = np.where(np.abs(u) < k, (u / k) ** 2, 1.0)
+        psi = u * (1 - v) ** 2
+        dpsi = (1 - v) * (1 - 5 * v)
+    n = len(x)
+    mean_dpsi = dpsi.mean()
+    factor = (psi @ psi / n) / mean_dpsi ** 2 if mean_dpsi > 0 else np.inf
+    scale2 = scale ** 2 * factor * n / max(n - 2, 1)
+    return (m, c) + _line_errors(scale2, x_mean, sxx, w_sum)
+
+def _ranks(order):
+    """由排列order求各元素的名次"""
+    ranks = np.empty(len(order), dtype=np.int64)
+    ranks[order] = np.arange(len(order))
+    return ranks
+
+def _index_dtype(size):
+    """能表示[0, size)的最小整数类型，减少逐层划分的内存带宽"""
+    return np.int32 if size <= np.iinfo(np.int32).max else np.int64
+
+def _inversion_levels(seq, ids):
+    """
+    对名次序列seq逐位(从高位到低位)做稳定划分，枚举其中的逆序对
+
+    序列长度补齐到2的幂后，第b位这一层中每个长为2^(b+1)的块由同一高位前缀的
+    元素组成；块内第b位为0的元素与排在它前面、第b位为1的元素构成逆序对，
+    这些伙伴在划分后的序列中连续存放。每层生成
+    (第b位为0的元素id, 伙伴在新序列中的起始位置, 伙伴个数, 新序列的id)，
+    总计数即逆序对个数，每层计算量为O(n)。
+    """
+    n = len(seq)
+    n_bits = max(int(n - 1).bit_length(), 1)
+    size = 1 << n_bits
+    dtype = _index_dtype(size)
+    # 末尾补上更大的名次，不产生新的逆序对
+    seq = np.concatenate([seq, np.arange(n, size)]).astype(dtype)
+    ids = np.concatenate([ids, np.full(size - n, -1)]).astype(dtype)
+    local = np.arange(size, dtype=dtype)
+    for b in range(n_bits - 1, -1, -1):
+        width = 2 << b
+        bit = (seq >> b) & 1
+        ones_before = np.cumsum(bit.reshape(-1, width), axis=1, dtype=dtype).ravel() - bit
+        zero = bit == 0
+        ones_start = (local & ~(width - 1)) + (1 << b)
+        new_pos = np.where(zero, local - ones_before, ones_start + ones_before)
+        new_seq = np.empty_like(seq)
+        new_seq[new_pos] = seq
+        new_ids = np.empty_like(ids)
+        new_ids[new_pos] = ids
+        yield ids[zero], ones_start[zero], ones_before[zero], new_ids
+        seq, ids = new_seq, new_ids
+
+def _count_inversions(seq):
+    """名次序列中逆序对的个数"""
+    n = len(seq)
+    n_bits = max(int(n - 1).bit_length(), 1)
+    size = 1 << n_bits
+    dtype = _index_dtype(size)
+    seq = np.concatenate([seq, np.arange(n, size)]).astype(dtype)
+    local = np.arange(size, dtype=dtype)
+    total = 0
+    for b in range(n_bits - 1, -1, -1):
+        width = 2 << b
+        bit = (seq >> b) & 1
+        cum = np.cumsum(bit.reshape(-1, width), axis=1, dtype=dtype)
+        ones_before = cum.ravel() - bit
+        zero = bit == 0
+        # 块内k个1彼此贡献k(k-1)/2，其余为与后面的0构成的逆序对
+        ones = cum[:, -1].astype(np.int64)
+        total += int(ones_before.sum(dtype=np.int64) - (ones * (ones - 1) // 2).sum())
+        new_pos = np.where(zero, local - ones_before,
+                           (local & ~(width - 1)) + (1 << b) + ones_before)
+        new_seq = np.empty_like(seq)
+        new_seq[new_pos] = seq
+        seq = new_seq
+    return total
+
+def _inversion_pairs(seq, ids, draws=None):
+    """
+    返回逆序对的两端id
+
+    draws为None时枚举全部逆序对；否则draws是[0, 逆序对总数)中已排序的整数，
+    只返回这些编号对应的逆序对（用于均匀抽样）。
+    """
+    first, second = [], []
+    offset = 0
+    for zero_ids, starts, counts, new_ids in _inversion_levels(seq, ids):
+        cum = np.cumsum(counts)
+        level_total = int(cum[-1]) if len(cum) else 0
+        if draws is None:
+            idx = np.repeat(np.arange(len(counts)), counts)
+            within = np.arange(level_total) - (cum - counts)[idx]
+        else:
+            lo, hi = np.searchsorted(draws, [offset, offset + level_total])
+            local = draws[lo:hi] - offset
+            idx = np.searchsorted(cum, local, side='right')
+            within = local - (cum - counts)[idx]
+        first.append(zero_ids[idx])
+        second.append(new_ids[starts[idx] + within])
+        offset += level_total
+    return np.concatenate(first), np.concatenate(second)
+
+def _theil_sen_slope(x, y, rng):
+    """
+    Theil–Sen斜率：所有x不同的点对斜率的中位数，期望O(n log n)
+
+    斜率不超过t的点对个数等于按x排序与按 y - t x 排序之间的逆序对数，
+    两个斜率界lo、hi之间的点对恰为两种 y - t x 排序之间的逆序对，
+    可以均匀抽样或全部枚举。每轮从当前区间内抽样，用样本分位数收缩区间并
+    精确计数校验，直到区间内的点对足够少时全部枚举并选出中位数。大量点对
+    斜率恰好相等时区间无法收缩，此时检查候选值是否正是中位数：斜率小于t
+    的点对不超过目标次序、斜率不超过t的点对超过目标次序时直接返回t。
+    """
+    n = len(x)
+    pos = np.arange(n)
+    _, tie_counts = np.unique(x, return_counts=True)
+    n_pairs = n * (n - 1) // 2 - int((tie_counts * (tie_counts - 1) // 2).sum())
+    if n_pairs == 0:
+        raise ValueError("无法计算参数，分母为零")
+    targets = ((n_pairs - 1) // 2, n_pairs // 2)
+
+    if n_pairs <= THEIL_SEN_BRUTE_PAIRS:
+        i, j = np.triu_indices(n, k=1)
+        keep = x[i] != x[j]
+        slopes = (y[j[keep]] - y[i[keep]]) / (x[j[keep]] - x[i[keep]])
+        return np.partition(slopes, targets)[list(targets)].mean()
+
+    # x升序（x相同按y、下标）；y - t x升序（相同按x降序、下标），
+    # 二者之间的逆序对恰为斜率 <= t 的点对
+    x_order = np.lexsort((pos, y, x))
+
+    def order_at(t):
+        if t == -np.inf:
+            return x_order
+        if t == np.inf:
+            return np.lexsort((pos, y, -x))
+        z = y - t * x
+        order = np.argsort(z, kind='stable')
+        # 只有出现相等的键时才需要完整的多键排序
+        if np.any(z[order[1:]] == z[order[:-1]]):
+            order = np.lexsort((pos, -x, z))
+        return order
+
+    def slopes_of(a, b):
+        return (y[a] - y[b]) / (x[a] - x[b])
+
+    def is_median(t, count):
+        # count为斜率 <= t 的点对数；y - t x相同时按x升序排列，逆序对即斜率 < t 的点对
+        if count <= targets[1]:
+            return False
+        strict = np.lexsort((pos, x, y - t * x))
+        return _count_inversions(_ranks(strict)[x_order]) <= targets[0]
+
+    bounds = [[-np.inf, x_order, 0], [np.inf, order_at(np.inf), n_pairs]]
+    spread = 3.0
+    enum_limit = max(10 * n, THEIL_SEN_BRUTE_PAIRS)
+    for round_ in range(THEIL_SEN_MAX_ROUNDS + 1):
+        (lo, lo_order, c_lo), (hi, hi_order, c_hi) = bounds
+        inside = c_hi - c_lo
+        seq = _ranks(hi_order)[lo_order]
+        if inside <= enum_limit or round_ == THEIL_SEN_MAX_ROUNDS:
+            slopes = slopes_of(*_inversion_pairs(seq, lo_order))
+            ks = [k - c_lo for k in targets]
+            return np.partition(slopes, ks)[ks].mean()
+
+        size = min(THEIL_SEN_SAMPLE, inside)
+        if lo == -np.inf and hi == np.inf:
+            a = rng.integers(0, n, size)
+            b = rng.integers(0, n, size)
+            keep = x[a] != x[b]
+            sample = slopes_of(a[keep], b[keep])
+        else:
+            draws = np.sort(rng.integers(0, inside, size))
+            sample = slopes_of(*_inversion_pairs(seq, lo_order, draws))
+        delta = spread / np.sqrt(len(sample))
+        q_lo = (targets[0] - c_lo) / inside - delta
+        q_hi = (targets[1] + 1 - c_lo) / inside + delta
+
+        improved = False
+        if q_lo > 0:
+            t = np.quantile(sample, q_lo)
+            if t > lo:
+                order = order_at(t)
+                count = _count_inversions(_ranks(order)[x_order])
+                if count <= targets[0]:
+                    bounds[0] = [t, order, count]
+                    improved = True
+                elif is_median(t, count):
+                    return t
+        if q_hi < 1:
+            t = np.quantile(sample, q_hi)
+            if t < hi:
+                order = order_at(t)
+                count = _count_inversions(_ranks(order)[x_order])
+                if count > targets[1]:
+                    if is_median(t, count):
+                        return t
+                    bounds[1] = [t, order, count]
+                    improved = True
+        if not improved:
+            spread *= 2
+
+def fit_line(x, y, method='ols', sigma=None, max_iter=50, tol=1e-10, seed=0):
+    """
+    拟合直线 y = m x + c，支持加权与稳健回归
+
+    参数:
+        x, y: 数据数组
+        method: 'ols'普通最小二乘；'wls'按1/sigma²加权的最小二乘；
+                'huber'、'tukey'为相应权函数的迭代重加权最小二乘(IRLS)，
+                残差尺度用MAD估计；'theil_sen'为点对斜率中位数
+        sigma: 每个点y的标准差。'wls'必需，'huber'、'tukey'用作先验权重，
+               'ols'、'theil_sen'忽略
+        max_iter: IRLS最大迭代次数
+        tol: IRLS参数相对变化的收敛容差
+        seed: Theil–Sen随机选择的种子（只影响计算过程，不影响结果）
+
+    返回:
+        m, c: 斜率和截距
+        m_err, c_err: 标准误差。'wls'按给定sigma的绝对误差计算；IRLS用M估计的
+                      渐近协方差；Theil–Sen用正态误差下的渐近方差
+                      Var(m) ≈ π s² / (3 Sxx) 近似，s为残差的MAD尺度
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if len(x) == 0 or len(y) == 0:
+        raise ValueError("输入数据不能为空")
+    if len(x) != len(y):
+        raise ValueError("x和y数组长度必须相同")
+    if sigma is not None:
+        sigma = np.broadcast_to(np.asarray(sigma, dtype=float), x.shape)
+        if np.any(sigma <= 0):
+            raise ValueError("sigma必须为正数")
+
+    if method in ('ols', 'wls'):
+        if method == 'wls' and sigma is None:
+            raise ValueError("加权最小二乘需要提供sigma")
+        w = 1 / sigma ** 2 if method == 'wls' else np.ones_like(x)
+        m, c, x_mean, sxx, w_sum = _weighted_line(x, y, w)
+        if method == 'wls':
+            scale2 = 1.0
+        else:
+            r = y - m * x - c
+            scale2 = (r @ r) / max(len(x) - 2, 1)
+        return (m, c) + _line_errors(scale2, x_mean, sxx, w_sum)
+
+    if method in ('huber', 'tukey'):
+        prior = np.ones_like(x) if sigma is None else 1 / sigma ** 2
+        return _irls(x, y, prior, method, max_iter, tol)
+
+    if method == 'theil_sen':
+        m = _theil_sen_slope(x, y, np.random.default_rng(seed))
+        c = np.median(y - m * x)
+        scale = _mad_scale(y - m * x - c)
+        x_mean = x.mean()
+        sxx = ((x - x_mean) ** 2).sum()
+        m_err = np.sqrt(np.pi / 3 * scale ** 2 / sxx)
+        c_err = np.sqrt(m_err ** 2 * x_mean ** 2 + np.pi / 2 * scale ** 2 / len(x))
+        return m, c, m_err, c_err
+
+    raise ValueError(f"未知的拟合方法: {method}")
@@ -1,5 +1,4 @@
 import numpy as np
-import matplotlib.pyplot as plt
 
 class BacteriaModel:
     def __init__(self, A, tau):
@@ -49,6 +48,7 @@ class BacteriaModel:
         w = self.w_model(t)
         
         # 绘制 V(t) 和 W(t) 曲线
+        import matplotlib.pyplot as plt
         plt.plot(t, v, label='V(t)')
         plt.plot(t, w, label='W(t)')
         
@@ -99,6 +99,7 @@ def main():
     time_data, response_data = load_bacteria_data('data/g149novickA.txt')
     
     # 绘制实验数据点
+    import matplotlib.pyplot as plt
     plt.scatter(time_data, response_data, label='Experimental Data')
     
     # 添加图例
@@ -3,7 +3,6 @@ Logistic映射与混沌系统研究（解决方案）
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
 
 def iterate_logistic(r, x0, n):
     """
@@ -38,6 +37,7 @@ def plot_time_series(r, x0, n):
     x = iterate_logistic(r, x0, n)
     t = np.arange(n)
     
+    import matplotlib.pyplot as plt
     fig, ax = plt.subplots(figsize=(10, 6))
     ax.plot(t, x, 'b-', lw=1)
     ax.set_xlabel('迭代次数')
@@ -75,6 +75,7 @@ def plot_bifurcation(r_min, r_max, n_r, n_iterations, n_discard):
         x_plot.extend(x[n_discard:])
         r_plot.extend([r_val] * (n_iterations - n_discard))
     
+    import matplotlib.pyplot as plt
     fig, ax = plt.subplots(figsize=(12, 8))
     ax.plot(r_plot, x_plot, ',k', alpha=0.1, markersize=0.1)
     ax.set_xlabel('r')
@@ -84,6 +85,8 @@ def plot_bifurcation(r_min, r_max, n_r, n_iterations, n_discard):
     return fig
 def main():
     """主函数"""
+    import matplotlib.pyplot as plt
+
     # 时间序列分析
     r_values = [2.0, 3.2, 3.45, 3.6]
     x0 = 0.5
@@ -3,7 +3,6 @@
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
 
 def load_data(filename):
     """
@@ -69,6 +68,7 @@ def plot_data_and_fit(x, y, m, c):
     if len(x) != len(y):
         raise ValueError("x 和 y 的长度必须相同")
     
+    import matplotlib.pyplot as plt
     fig, ax = plt.subplots()
     ax.scatter(x, y, label='experimental data')
     ax.plot(x, m * x + c, color='red', label='Least-squares fitting straight line')
@@ -100,6 +100,8 @@ def calculate_planck_constant(m):
 
 def main():
     """主函数"""
+    import matplotlib.pyplot as plt
+
     filename = "millikan.txt"
     x, y = load_data(filename)
     
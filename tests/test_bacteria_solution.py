@@ -0,0 +1,89 @@
+import unittest
+import numpy as np
+from solutions.bacteria_model_solution import (BacteriaModel, fit_bacteria_batch,
+                                               load_bacteria_data)
+from solutions.basis_cache import ExponentialBasisCache
+
+class TestBacteriaModelSolution(unittest.TestCase):
+    def test_models_broadcast_parameters(self):
+        t = np.linspace(0, 10, 100)
+        tau = np.array([1.0, 2.0, 4.0])
+        model = BacteriaModel(A=np.array([[0.5], [1.0]]), tau=tau)
+        self.assertEqual(model.v_model(t).shape, (3, 100))
+        self.assertEqual(model.w_model(t).shape, (2, 3, 100))
+        np.testing.assert_allclose(model.w_model(t)[1, 1],
+                                   BacteriaModel(1.0, 2.0).w_model(t))
+
+    def test_exponential_basis_cache(self):
+        cache = ExponentialBasisCache(maxsize=3)
+        t = np.linspace(0, 5, 20)
+        basis = cache(np.array([0.5, 1.0, 0.5]), t)
+        np.testing.assert_allclose(basis, np.exp(-np.outer([0.5, 1.0, 0.5], t)))
+        self.assertEqual(cache.cache_info(), (0, 2, 2, 3))
+        cache(1.0, t)
+        cache(2.0, t)
+        cache(3.0, t)
+        self.assertEqual(cache.cache_info(), (1, 4, 3, 3))
+        self.assertFalse(cache(1.0, t).flags.writeable)
+
+    def test_exponential_basis_cache_bounds(self):
+        cache = ExponentialBasisCache(maxbytes=3 * 20 * 8, max_grid_size=100)
+        t = np.linspace(0, 5, 20)
+        for rate in (1.0, 2.0, 3.0, 4.0):
+            cache(rate, t)
+        self.assertEqual(cache.cache_info()[2], 3)
+        self.assertEqual(cache.nbytes, 3 * 20 * 8)
+        large = np.linspace(0, 5, 101)
+        np.testing.assert_allclose(cache([0.5, 1.0], large), np.exp(-np.outer([0.5, 1.0], large)))
+        self.assertEqual(cache.cache_info()[2], 3)
+        self.assertEqual(np.shape(cache(0.5, 2.0)), ())
+        self.assertEqual(np.shape(BacteriaModel(1.0, 2.0).v_model(3.0)), ())
+
+        # 一次请求大量速率时，保存的条目不引用整批结果，nbytes即实际占用
+        cache = ExponentialBasisCache(maxbytes=8 * 20 * 8)
+        cache(np.linspace(0.1, 20, 200), t)
+        self.assertEqual(cache.cache_info()[2], 8)
+        self.assertEqual(cache.nbytes, 8 * 20 * 8)
+        self.assertTrue(all(entry.base is None for entry in cache._entries.values()))
+
+    def test_fit_v_w_and_joint(self):
+        t = np.linspace(0.2, 12, 30)
+        true = BacteriaModel(A=0.08, tau=3.0)
+        (tau,), _ = BacteriaModel.fit_v(t, true.v_model(t))
+        self.assertAlmostEqual(tau, 3.0, places=8)
+        params, _ = BacteriaModel.fit_w(t, true.w_model(t))
+        np.testing.assert_allclose(params, [0.08, 3.0], rtol=1e-8)
+        varpro, cov_varpro = BacteriaModel.fit_w(t, true.w_model(t), method='varpro')
+        np.testing.assert_allclose(varpro, [0.08, 3.0], rtol=1e-8)
+        self.assertEqual(cov_varpro.shape, (2, 2))
+        with self.assertRaises(ValueError):
+            BacteriaModel.fit_w(t, true.w_model(t), method='newton')
+        params, cov = BacteriaModel.fit_joint(t, true.v_model(t), t[::2],
+                                                      true.w_model(t[::2]))
+        np.testing.assert_allclose(params, [0.08, 3.0], rtol=1e-8)
+        self.assertEqual(cov.shape, (2, 2))
+
+    def test_fit_batch_matches_single_fits(self):
+        t_a, y_a = load_bacteria_data('data/g149novickA.txt')
+        series = [(t_a, y_a), (t_a[:12], y_a[:12]), (t_a[::2], y_a[::2])]
+        table = fit_bacteria_batch(series, model='v')
+        self.assertTrue(np.all(table['converged']))
+        for row, (t, y) in zip(table, series):
+            (tau,), _ = BacteriaModel.fit_v(t, y)
+            self.assertAlmostEqual(row['tau'], tau, places=6)
+
+    def test_fit_batch_marks_short_series(self):
+        t = np.linspace(0.2, 12, 30)
+        true = BacteriaModel(A=0.08, tau=3.0)
+        table = fit_bacteria_batch([(t, true.w_model(t)), (t[:2], true.w_model(t[:2]))],
+                                   model='w')
+        self.assertEqual(list(table['converged']), [True, False])
+        np.testing.assert_allclose(table[0]['tau'], 3.0, rtol=1e-8)
+        self.assertTrue(np.isnan(table[1]['tau']))
+        self.assertEqual(len(fit_bacteria_batch([], model='w')), 0)
+        table = fit_bacteria_batch([(t[:0], t[:0])], model='w')
+        self.assertFalse(table[0]['converged'])
+        self.assertTrue(np.isnan(table[0]['tau']))
+
+if __name__ == "__main__":
+    unittest.main()
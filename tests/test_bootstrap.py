@@ -0,0 +1,64 @@
+"""
+测试自助法与刀切法置信区间
+"""
+
+import numpy as np
+from solutions.bootstrap import (bootstrap, jackknife, linear_fit_batch,
+                                 tau_fit_batch, hiv_fit_batch)
+from solutions.bacteria_model_solution import fit_tau_batch
+
+def _mean_batch(x, y):
+    return y.mean(axis=-1, keepdims=True)
+
+def test_linear_fit_batch():
+    """测试批量直线拟合与np.polyfit一致"""
+    rng = np.random.default_rng(0)
+    x = rng.uniform(0, 10, size=(5, 20))
+    y = 2.0 * x + 1.0 + rng.normal(0, 0.1, size=x.shape)
+    params = linear_fit_batch(x, y)
+    for i in range(5):
+        assert np.allclose(params[i], np.polyfit(x[i], y[i], 1))
+    assert np.all(np.isnan(linear_fit_batch(np.ones((1, 4)), np.arange(4.0))))
+
+def test_bootstrap_reproducible():
+    """测试自助法结果只由种子决定，与批大小划分后的进程数无关"""
+    x, y = np.loadtxt('data/millikan.txt', unpack=True)
+    estimate, interval, samples = bootstrap(linear_fit_batch, x, y, n_boot=2000,
+                                            seed=42, batch_size=500)
+    _, interval2, samples2 = bootstrap(linear_fit_batch, x, y, n_boot=2000,
+                                       seed=42, batch_size=500, workers=2)
+    assert samples.shape == (2000, 2)
+    assert np.array_equal(samples, samples2, equal_nan=True)
+    assert np.all(interval[0] <= estimate) and np.all(estimate <= interval[1])
+
+def test_bootstrap_residuals():
+    """测试残差重抽样的置信区间覆盖真实斜率"""
+    rng = np.random.default_rng(1)
+    x = np.linspace(0, 1, 50)
+    y = 3.0 * x - 1.0 + rng.normal(0, 0.05, size=50)
+    predict = lambda p, x: p[0] * x + p[1]
+    _, interval, _ = bootstrap(linear_fit_batch, x, y, n_boot=1000, method='residuals',
+                               predict=predict, seed=0)
+    assert interval[0, 0] < 3.0 < interval[1, 0]
+
+def test_jackknife_mean():
+    """测试样本均值的刀切法标准误差等于 s/sqrt(n)"""
+    y = np.random.default_rng(2).normal(size=30)
+    estimate, std_error, bias = jackknife(_mean_batch, np.zeros(30), y)
+    assert np.isclose(estimate[0], y.mean())
+    assert np.isclose(std_error[0], y.std(ddof=1) / np.sqrt(30))
+    assert np.isclose(bias[0], 0.0, atol=1e-12)
+
+def test_model_fit_batches():
+    """测试细菌模型tau和HIV模型的批量拟合接口"""
+    t = np.linspace(0.2, 10, 25)
+    v = 1 - np.exp(-t / np.array([[1.5], [3.0]]))
+    assert np.allclose(fit_tau_batch(t, v), [1.5, 3.0])
+    t_a, v_a = np.loadtxt('data/g149novickA.txt', delimiter=',', unpack=True)
+    estimate, interval, _ = bootstrap(tau_fit_batch, t_a, v_a, n_boot=200, seed=0)
+    assert interval[0, 0] < estimate[0] < interval[1, 0]
+    
+    t = np.linspace(0, 7, 16)
+    load = 1e5 * np.exp(-0.5 * t) + 4e4 * np.exp(-3.0 * t)
+    params = hiv_fit_batch(t[np.newaxis], load[np.newaxis])[0]
+    assert np.allclose(params, [4e4, 3.0, 1e5, 0.5], rtol=1e-6)
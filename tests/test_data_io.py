@@ -0,0 +1,55 @@
+"""
+测试数据文件的统一读取与缓存
+"""
+
+import os
+
+import numpy as np
+from solutions.data_io import sniff_format, read_table, load_columns, cache_path
+
+def test_sniff_format():
+    """测试分隔符与表头探测"""
+    assert sniff_format('data/millikan.txt') == (None, 0, None)
+    assert sniff_format('data/HIVseries.csv') == (',', 0, None)
+
+def test_read_table_with_header_and_chunks(tmp_path):
+    """测试带注释和表头的文件分块读取"""
+    path = tmp_path / 'series.csv'
+    rows = np.column_stack([np.arange(10.0), np.arange(10.0) ** 2])
+    with open(path, 'w') as f:
+        f.write('# instrument export\ntime,value\n')
+        np.savetxt(f, rows, delimiter=',')
+    assert sniff_format(path) == (',', 2, ['time', 'value'])
+    data, columns = read_table(path, chunk_rows=3, cache=False)
+    assert columns == ['time', 'value']
+    assert np.array_equal(data, rows)
+    assert not os.path.exists(cache_path(path))
+
+def test_cache_invalidation(tmp_path):
+    """测试二进制缓存的写入与失效"""
+    path = tmp_path / 'data.txt'
+    np.savetxt(path, [[1.0, 2.0], [3.0, 4.0]])
+    x, y = load_columns(path)
+    assert np.array_equal(x, [1.0, 3.0])
+    assert os.path.exists(cache_path(path))
+    
+    np.savetxt(path, [[5.0, 6.0], [7.0, 8.0], [9.0, 10.0]])
+    x, y = load_columns(path)
+    assert np.array_equal(y, [6.0, 8.0, 10.0])
+    
+    np.savez(tmp_path / 'data.npz', time=x, value=y)
+    data, columns = read_table(tmp_path / 'data.npz')
+    assert columns == ['time', 'value']
+    assert np.array_equal(data[:, 1], y)
+
+def test_corrupt_cache_falls_back_to_text(tmp_path):
+    """测试截断的缓存文件被忽略并重新解析"""
+    path = tmp_path / 'data.txt'
+    np.savetxt(path, [[1.0, 2.0], [3.0, 4.0]])
+    load_columns(path)
+    with open(cache_path(path), 'rb') as f:
+        head = f.read(40)
+    with open(cache_path(path), 'wb') as f:
+        f.write(head)
+    x, y = load_columns(path)
+    assert np.array_equal(y, [2.0, 4.0])
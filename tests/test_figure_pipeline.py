@@ -0,0 +1,36 @@
+"""
+测试批量渲染图像
+"""
+
+import os
+
+import pytest
+
+from solutions.figure_pipeline import FigureJob, hash_path, render_figures
+from solutions.logistic_map_solution import plot_lyapunov, plot_time_series
+
+def test_render_and_skip_unchanged(tmp_path):
+    """测试渲染输出和哈希记录，输入未变时跳过，变化或输出缺失时重新渲染"""
+    jobs = [FigureJob(plot_time_series, str(tmp_path / "ts.png"), (3.2, 0.5, 50), figsize=(4, 3)),
+            FigureJob(plot_lyapunov, str(tmp_path / "lyap.png"), (3.0, 4.0, 20, 50, 50)),
+            (plot_time_series, str(tmp_path / "ts2.png"), (3.6, 0.5, 50), {}, (4, 3))]
+    assert render_figures(jobs, dpi=20) == [True, True, True]
+    for job in jobs:
+        assert os.path.exists(job[1]) and os.path.exists(hash_path(job[1]))
+
+    assert render_figures(jobs, dpi=20) == [False, False, False]
+    assert render_figures(jobs, dpi=30) == [True, True, True], "dpi变化应重新渲染"
+
+    jobs[0] = jobs[0]._replace(args=(3.3, 0.5, 50))
+    os.remove(jobs[1].path)
+    assert render_figures(jobs, dpi=30) == [True, True, False]
+    assert render_figures(jobs, dpi=30, force=True) == [True, True, True]
+
+def test_duplicate_paths(tmp_path):
+    """测试输出路径重复时报错"""
+    path = str(tmp_path / "a.png")
+    with pytest.raises(ValueError):
+        render_figures([FigureJob(plot_time_series, path, (3.2, 0.5, 10))] * 2)
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
@@ -0,0 +1,105 @@
+import unittest
+import warnings
+import numpy as np
+from solutions.hiv_model_solution import (HIVModel as HIVModelSolution, fit_hiv_batch,
+                                         hiv_grid_search)
+from solutions.least_squares import ConvergenceWarning
+
+class TestHIVModelSolution(unittest.TestCase):
+    def test_fit_recovers_parameters(self):
+        true = HIVModelSolution(A=1e5, alpha=2.0, B=3e4, beta=0.3)
+        time = np.linspace(0, 10, 50)
+        noise = 1 + 0.01 * np.random.default_rng(0).standard_normal(50)
+        params, covariance = HIVModelSolution.fit(time, true.viral_load(time) * noise)
+        np.testing.assert_allclose(params, [1e5, 2.0, 3e4, 0.3], rtol=0.05)
+        self.assertEqual(covariance.shape, (4, 4))
+        self.assertTrue(np.all(np.diag(covariance) > 0))
+
+    def test_jacobian_matches_finite_difference(self):
+        model = HIVModelSolution(A=1000, alpha=0.5, B=500, beta=0.1)
+        time = np.linspace(0, 10, 20)
+        J = model.jacobian(time)
+        p = np.array([1000, 0.5, 500, 0.1])
+        for k in range(4):
+            dp = np.zeros(4)
+            dp[k] = 1e-6 * max(abs(p[k]), 1)
+            diff = (HIVModelSolution(*(p + dp)).viral_load(time)
+                    - HIVModelSolution(*(p - dp)).viral_load(time)) / (2 * dp[k])
+            np.testing.assert_allclose(J[:, k], diff, rtol=1e-5)
+
+    def test_fit_batch_matches_single_fits(self):
+        rng = np.random.default_rng(1)
+        series = []
+        for n in (12, 20, 35):
+            time = np.sort(rng.uniform(0, 10, n))
+            model = HIVModelSolution(A=1.2e5, alpha=2.0, B=2e4, beta=0.2)
+            series.append((time, model.viral_load(time) * (1 + 0.01 * rng.standard_normal(n))))
+        table = fit_hiv_batch(series)
+        self.assertEqual(len(table), 3)
+        self.assertTrue(np.all(table['converged']))
+        self.assertEqual(list(table['n_points']), [12, 20, 35])
+        for row, (time, load) in zip(table, series):
+            params, _ = HIVModelSolution.fit(time, load)
+            np.testing.assert_allclose([row['A'], row['alpha'], row['B'], row['beta']],
+                                       params, rtol=1e-4)
+
+    def test_fits_label_faster_rate_alpha(self):
+        rng = np.random.default_rng(3)
+        series = []
+        for _ in range(40):
+            alpha, beta = np.sort(rng.uniform(0.05, 3, 2))[::-1]
+            time = np.sort(rng.uniform(0, 10, 25))
+            model = HIVModelSolution(rng.uniform(1e3, 1e5), alpha, rng.uniform(1e3, 1e5), beta)
+            series.append((time, model.viral_load(time) * (1 + 0.05 * rng.standard_normal(25))))
+        table = fit_hiv_batch(series)
+        ok = np.isfinite(table['alpha'])
+        self.assertTrue(np.all(table['alpha'][ok] >= table['beta'][ok]))
+        # 排序与是否收敛无关，部分带噪声的序列在默认迭代次数内不收敛
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', ConvergenceWarning)
+            for time, load in series[:10]:
+                params, covariance = HIVModelSolution.fit(time, load)
+                self.assertGreaterEqual(params[1], params[3])
+                self.assertTrue(np.all(np.diag(covariance) > 0))
+
+    def test_fit_batch_marks_short_series(self):
+        time = np.linspace(0, 10, 30)
+        load = HIVModelSolution(A=1.2e5, alpha=2.0, B=2e4, beta=0.2).viral_load(time)
+        table = fit_hiv_batch([(time, load), (time[:3], load[:3])])
+        self.assertEqual(list(table['converged']), [True, False])
+        np.testing.assert_allclose(table[0]['beta'], 0.2, rtol=1e-6)
+        self.assertTrue(np.isnan(table[1]['A']) and np.isnan(table[1]['cost']))
+        self.assertEqual(len(fit_hiv_batch([])), 0)
+        table = fit_hiv_batch([(time[:0], load[:0])])
+        self.assertFalse(table[0]['converged'])
+        self.assertTrue(np.isnan(table[0]['beta']))
+
+    def test_fit_varpro_matches_lm(self):
+        time, load = np.loadtxt('data/HIVseries.csv', delimiter=',', unpack=True)
+        lm, _ = HIVModelSolution.fit(time, load)
+        varpro, _ = HIVModelSolution.fit(time, load, method='varpro')
+        np.testing.assert_allclose(varpro, lm, rtol=1e-4)
+
+    def test_viral_load_broadcasts_parameters(self):
+        time = np.linspace(0, 10, 50)
+        alpha = np.array([1.0, 2.0, 3.0])
+        beta = np.array([[0.1], [0.2]])
+        surface = HIVModelSolution(1e5, alpha, 2e4, beta).viral_load(time)
+        self.assertEqual(surface.shape, (2, 3, 50))
+        self.assertEqual(np.shape(HIVModelSolution(1000, 0.5, 500, 0.1).viral_load(2.0)), ())
+        expected = HIVModelSolution(1e5, 2.0, 2e4, 0.2).viral_load(time)
+        np.testing.assert_allclose(surface[1, 1], expected, rtol=1e-15)
+
+    def test_grid_search_and_global_fit(self):
+        time = np.linspace(0, 10, 40)
+        load = HIVModelSolution(1e5, 2.0, 2e4, 0.2).viral_load(time)
+        rates, cost = hiv_grid_search(time, load, n_grid=300)
+        self.assertEqual(cost.shape, (300, 300))
+        self.assertTrue(np.all(np.isinf(np.tril(cost))[np.tril_indices(300)]))
+        i, j = np.unravel_index(np.argmin(cost), cost.shape)
+        self.assertGreater(rates[i], rates[j])
+        params, _ = HIVModelSolution.fit_global(time, load, n_grid=300)
+        np.testing.assert_allclose(params, [1e5, 2.0, 2e4, 0.2], rtol=1e-6)
+
+if __name__ == "__main__":
+    unittest.main()
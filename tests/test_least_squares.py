@@ -0,0 +1,58 @@
+"""
+测试非线性最小二乘求解器
+"""
+
+import numpy as np
+import pytest
+from solutions.least_squares import (ConvergenceWarning, levenberg_marquardt,
+                                     variable_projection, fit_exponential_sum)
+
+def test_levenberg_marquardt():
+    """测试LM求解器拟合单指数衰减"""
+    t = np.linspace(0, 5, 30)
+    y = 3.0 * np.exp(-0.7 * t)
+    
+    def residual_and_jacobian(p):
+        e = np.exp(-p[1] * t)
+        return p[0] * e - y, np.stack([e, -p[0] * t * e], axis=-1)
+    
+    params, covariance = levenberg_marquardt(residual_and_jacobian, [1.0, 0.1])
+    assert np.allclose(params, [3.0, 0.7], rtol=1e-8)
+    assert covariance.shape == (2, 2)
+
+    with pytest.warns(ConvergenceWarning):
+        levenberg_marquardt(residual_and_jacobian, [1.0, 0.1], max_iter=2)
+
+def test_variable_projection_single_basis():
+    """测试变量投影法：W(t) = A(e^{-t/τ} - 1 + t/τ)只需在τ上迭代"""
+    t = np.linspace(0.1, 10, 40)
+    y = 0.8 * (np.exp(-t / 2.5) - 1 + t / 2.5)
+    
+    def basis(theta):
+        tau = theta[0]
+        e = np.exp(-t / tau)
+        Phi = (e - 1 + t / tau)[:, np.newaxis]
+        dPhi = ((t / tau**2) * e - t / tau**2)[np.newaxis, :, np.newaxis]
+        return Phi, dPhi
+    
+    theta, coefficients = variable_projection(basis, [1.0], y)
+    assert abs(theta[0] - 2.5) < 1e-6, "τ拟合错误"
+    assert abs(coefficients[0] - 0.8) < 1e-6, "A应由闭式解得到"
+
+def test_fit_exponential_sum_three_terms():
+    """测试三项指数和拟合，无需给出幅度初值"""
+    t = np.linspace(0, 10, 60)
+    y = 5 * np.exp(-3 * t) + 2 * np.exp(-0.8 * t) + np.exp(-0.1 * t)
+    amplitudes, rates, covariance = fit_exponential_sum(t, y, n_terms=3)
+    
+    assert np.allclose(rates, [3.0, 0.8, 0.1], rtol=1e-6)
+    assert np.allclose(amplitudes, [5.0, 2.0, 1.0], rtol=1e-6)
+    assert covariance.shape == (6, 6)
+
+def test_fit_exponential_sum_too_few_points():
+    """测试数据点不足时的异常处理"""
+    with pytest.raises(ValueError):
+        fit_exponential_sum(np.arange(4.0), np.ones(4), n_terms=2)
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
@@ -0,0 +1,216 @@
+"""
+测试Logistic映射解决方案代码
+"""
+
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+import matplotlib.pyplot as plt
+from solutions.logistic_map_solution import (compute_bifurcation, compute_bifurcation_density,
+                                          iter_logistic_chunks, logistic_orbit_statistics,
+                                          iterate_logistic, iterate_logistic_batch,
+                                          lyapunov_spectrum, detect_period,
+                                          locate_period_doubling, BifurcationTileStore,
+                                          save_orbit, save_orbit_batch, load_orbit,
+                                          precision_horizon, plot_bifurcation)
+
+def test_compute_bifurcation():
+    """测试向量化分岔计算与逐点迭代结果一致"""
+    r, x = compute_bifurcation(3.0, 3.6, 20, 100, 50)
+    assert r.shape == (20,)
+    assert x.shape == (20, 50), "输出形状应为(n_r, n_iterations - n_discard)"
+    
+    for i in (0, 7, 19):
+        expected = iterate_logistic(r[i], 0.5, 100)[50:]
+        assert np.array_equal(x[i], expected), "应与逐点迭代逐位相同"
+    
+    with pytest.raises(ValueError):
+        compute_bifurcation(3.0, 3.6, 20, 100, 100)
+
+def test_compute_bifurcation_density():
+    """测试密度栅格与逐点直方图一致"""
+    r, x = compute_bifurcation(3.0, 4.0, 30, 200, 50)
+    r_d, edges, counts = compute_bifurcation_density(3.0, 4.0, 30, 200, 50, n_x_bins=64)
+    
+    assert np.array_equal(r, r_d)
+    assert counts.shape == (30, 64), "计数数组形状应为(n_r, n_x_bins)"
+    expected = np.array([np.histogram(row, bins=edges)[0] for row in x])
+    assert np.array_equal(counts, expected), "密度栅格应与直方图一致"
+
+def test_plot_bifurcation_density():
+    """测试密度模式分岔图"""
+    fig = plot_bifurcation(3.0, 3.6, 100, 100, 50, mode='density')
+    ax = fig.get_axes()[0]
+    assert len(ax.get_images()) == 1, "密度模式应绘制一幅栅格图像"
+    plt.close(fig)
+
+def test_iter_logistic_chunks():
+    """测试分块迭代与整体迭代一致"""
+    chunks = list(iter_logistic_chunks(3.7, 0.3, 1000, chunk_size=128))
+    assert max(len(c) for c in chunks) == 128
+    assert np.array_equal(np.concatenate(chunks), iterate_logistic(3.7, 0.3, 1000))
+
+def test_logistic_orbit_statistics():
+    """测试流式统计量"""
+    x = iterate_logistic(3.7, 0.3, 5000)[100:]
+    stats = logistic_orbit_statistics(3.7, 0.3, 5000, n_discard=100, n_bins=20,
+                                      chunk_size=333)
+    
+    assert stats.count == len(x)
+    assert stats.min == x.min() and stats.max == x.max()
+    assert stats.histogram.sum() == len(x)
+    assert np.isclose(stats.lyapunov, np.mean(np.log(np.abs(3.7 * (1 - 2 * x)))))
+    assert stats.lyapunov > 0, "r=3.7时应为混沌，Lyapunov指数为正"
+
+def test_iterate_logistic_batch():
+    """测试批量迭代与逐条迭代一致，并支持复用输出缓冲区"""
+    r = np.array([2.0, 3.2, 3.5, 3.9])[:, np.newaxis]
+    x0 = np.array([0.1, 0.5, 0.7])
+    x = iterate_logistic_batch(r, x0, 100)
+    
+    assert x.shape == (4, 3, 100)
+    for i in range(4):
+        for j in range(3):
+            assert np.array_equal(x[i, j], iterate_logistic(r[i, 0], x0[j], 100))
+    
+    out = np.empty((4, 3, 100))
+    assert iterate_logistic_batch(r, x0, 100, out=out) is out
+    assert np.array_equal(out, x)
+    with pytest.raises(ValueError):
+        iterate_logistic_batch(r, x0, 100, out=np.empty((4, 100)))
+
+def test_lyapunov_spectrum():
+    """测试Lyapunov指数：周期区为负，混沌区为正，并与流式统计一致"""
+    r = np.array([2.8, 3.2, 3.5, 3.7, 4.0])
+    lam = lyapunov_spectrum(r, 0.3, 500, 2000)
+    
+    assert np.all(lam[:3] < 0), "周期区Lyapunov指数应为负"
+    assert np.all(lam[3:] > 0), "混沌区Lyapunov指数应为正"
+    assert abs(lam[-1] - np.log(2)) < 0.05, "r=4时λ应接近ln2"
+    
+    stats = logistic_orbit_statistics(3.7, 0.3, 2500, n_discard=500)
+    assert np.isclose(lam[3], stats.lyapunov, rtol=1e-12)
+
+def test_detect_period():
+    """测试批量周期检测"""
+    period = detect_period([2.0, 3.2, 3.5, 3.56, 3.83, 3.9], 0.5, 2000, 64)
+    assert list(period) == [1, 2, 4, 8, 3, 0], "周期检测结果错误"
+
+def test_locate_period_doubling():
+    """测试倍周期分岔点定位与Feigenbaum常数估计"""
+    r_points, delta = locate_period_doubling(8)
+    
+    assert abs(r_points[0] - 3.0) < 1e-10
+    assert abs(r_points[1] - (1 + np.sqrt(6))) < 1e-10
+    assert abs(r_points[2] - 3.544090359551) < 1e-10
+    assert np.all(np.diff(r_points) > 0), "分岔点应单调递增"
+    assert abs(delta[-1] - 4.6692) < 1e-3, "δ应接近Feigenbaum常数"
+
+def test_parallel_sweeps_match_serial():
+    """测试多进程扫描与单进程结果逐位相同"""
+    _, x1 = compute_bifurcation(2.5, 4.0, 101, 200, 50)
+    _, x2 = compute_bifurcation(2.5, 4.0, 101, 200, 50, workers=2)
+    assert np.array_equal(x1, x2)
+    
+    c1 = compute_bifurcation_density(2.5, 4.0, 101, 200, 50, n_x_bins=64)[2]
+    c2 = compute_bifurcation_density(2.5, 4.0, 101, 200, 50, n_x_bins=64, workers=2)[2]
+    assert np.array_equal(c1, c2)
+    
+    r = np.linspace(2.5, 4.0, 101)
+    assert np.array_equal(lyapunov_spectrum(r, 0.5, 100, 100),
+                          lyapunov_spectrum(r, 0.5, 100, 100, workers=2))
+
+def test_bifurcation_tile_store(tmp_path):
+    """测试瓦片缓存：瓦片内容正确，重复请求不再计算"""
+    store = BifurcationTileStore(str(tmp_path), 200, 50, tile_size=32)
+    tile = store.get_tile(2, 3, 2)
+    r0, r1, x0, x1 = store.tile_bounds(2, 3, 2)
+    
+    dr = (r1 - r0) / 32
+    r = np.linspace(r0 + dr / 2, r1 - dr / 2, 32)
+    x = iterate_logistic_batch(r, 0.5, 200)[:, 50:]
+    expected = np.array([np.histogram(row, bins=np.linspace(x0, x1, 33))[0] for row in x])
+    assert np.array_equal(tile, expected), "瓦片应与直接统计的直方图一致"
+    
+    counts, extent = store.render(3.0, 4.0, 0.0, 1.0, 64)
+    n_files = len(list(tmp_path.iterdir()))
+    counts2, extent2 = store.render(3.0, 4.0, 0.0, 1.0, 64)
+    assert len(list(tmp_path.iterdir())) == n_files, "缓存命中时不应生成新瓦片"
+    assert np.array_equal(counts, counts2) and extent == extent2
+    assert extent[0] <= 3.0 and extent[1] >= 4.0
+
+    other = BifurcationTileStore(str(tmp_path), 200, 50, tile_size=32, r_range=(3.0, 4.0))
+    assert other.tile_path(2, 3, 2) != store.tile_path(2, 3, 2), "不同范围的瓦片不应共用文件"
+    assert not np.array_equal(other.get_tile(2, 3, 2), tile)
+
+    with pytest.raises(ValueError):
+        plot_bifurcation(3.0, 4.0, 64, 200, 50, mode='density', n_x_bins=64,
+                                  cache_dir=str(tmp_path))
+
+def test_orbit_store(tmp_path):
+    """测试内存映射轨道的写入与零拷贝加载"""
+    path = str(tmp_path / "orbit.npy")
+    save_orbit(path, 3.7, 0.3, 1000, chunk_size=128)
+    orbit, meta = load_orbit(path)
+    
+    assert isinstance(orbit, np.memmap), "应返回内存映射数组"
+    assert meta['r'] == 3.7 and meta['x0'] == 0.3 and meta['n'] == 1000
+    assert np.array_equal(orbit, iterate_logistic(3.7, 0.3, 1000))
+    
+    path = str(tmp_path / "batch.npy")
+    r = np.array([3.2, 3.5, 3.9])
+    save_orbit_batch(path, r, 0.5, 100)
+    orbits, meta = load_orbit(path)
+    assert orbits.shape == (3, 100) and meta['r'] == r.tolist()
+    assert np.array_equal(orbits, iterate_logistic_batch(r, 0.5, 100))
+
+    path = str(tmp_path / "long.npy")
+    r = np.linspace(3.5, 3.9, 3, dtype=np.longdouble)
+    meta = save_orbit_batch(path, r, np.longdouble(0.5), 50, dtype=np.longdouble)
+    orbits, loaded = load_orbit(path)
+    assert loaded == meta and loaded['r'] == [3.5, 3.7, 3.9]
+    assert orbits.dtype == np.longdouble
+
+def test_dtype_selection():
+    """测试浮点类型参数贯穿各入口"""
+    for dtype in (np.float32, np.longdouble):
+        assert iterate_logistic(3.2, 0.5, 50, dtype=dtype).dtype == dtype
+        assert iterate_logistic_batch([3.2, 3.5], 0.5, 50, dtype=dtype).dtype == dtype
+        r, x = compute_bifurcation(3.0, 3.6, 10, 100, 50, dtype=dtype)
+        assert r.dtype == dtype and x.dtype == dtype
+        assert lyapunov_spectrum([3.2], 0.5, 100, 100, dtype=dtype).dtype == dtype
+    
+    x32 = iterate_logistic(2.0, 0.3, 100, dtype=np.float32)
+    assert abs(x32[-1] - 0.5) < 1e-6, "float32下r=2也应收敛到0.5"
+    
+    r = [3.7, 3.9, 4.0]
+    assert np.all(precision_horizon(r, 0.3, 300, np.float32) <
+                  precision_horizon(r, 0.3, 300, np.float64)), "float32应更早偏离参考轨道"
+
+def test_compute_import_without_matplotlib():
+    """测试导入计算模块不加载matplotlib，绘图时在无界面环境下使用Agg后端"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = (
+        "import sys\n"
+        "import solutions.logistic_map_solution, solutions.millikan_fit_solution\n"
+        "import solutions.hiv_model_solution, solutions.bacteria_model_solution\n"
+        "import solutions.bootstrap\n"
+        "assert 'matplotlib' not in sys.modules\n"
+        "from solutions.logistic_map_solution import plot_time_series\n"
+        "fig = plot_time_series(3.2, 0.5, 10)\n"
+        "import matplotlib\n"
+        "print(matplotlib.get_backend())\n"
+    )
+    env = {k: v for k, v in os.environ.items()
+           if k not in ('DISPLAY', 'WAYLAND_DISPLAY', 'MPLBACKEND')}
+    result = subprocess.run([sys.executable, "-c", code], cwd=root, env=env,
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    if sys.platform not in ('win32', 'darwin'):
+        assert result.stdout.strip().lower() == 'agg'
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
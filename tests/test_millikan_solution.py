@@ -0,0 +1,55 @@
+"""
+测试光电效应实验解决方案代码
+"""
+
+import os
+import numpy as np
+import pytest
+from solutions.millikan_fit_solution import (LinearFitAccumulator, calculate_parameters,
+                                          load_data, stream_fit_file)
+
+# 测试数据文件路径
+DATA_FILE = os.path.join(os.path.dirname(__file__), '../data/millikan.txt')
+
+def test_linear_fit_accumulator():
+    """测试流式累加器分块、合并后与一次性计算一致"""
+    rng = np.random.default_rng(0)
+    x = rng.uniform(5e14, 1.2e15, 1000)
+    y = 4.1e-15 * x - 1.7 + rng.normal(0, 0.01, 1000)
+    expected = calculate_parameters(x, y)
+    
+    left = LinearFitAccumulator()
+    for start in range(0, 600, 128):
+        left.update(x[start:min(start + 128, 600)], y[start:min(start + 128, 600)])
+    right = LinearFitAccumulator().update(x[600:], y[600:])
+    result = left.merge(right).result()
+    assert np.allclose(result, expected, rtol=1e-9)
+    
+    with pytest.raises(ValueError):
+        LinearFitAccumulator().result()
+
+def test_stream_fit_file():
+    """测试分块读取文件的流式拟合"""
+    x, y = load_data(DATA_FILE)
+    expected = calculate_parameters(x, y)
+    for chunk_rows in (1, 4, 6, 100):
+        assert np.allclose(stream_fit_file(DATA_FILE, chunk_rows), expected, rtol=1e-12)
+
+def test_calculate_parameters_stable_solvers():
+    """测试x均值远大于离散程度时稳定求解方法仍然准确"""
+    x, y = load_data(DATA_FILE)
+    expected = calculate_parameters(x, y, solver='normal')
+    for solver in ('centered', 'lstsq'):
+        result = calculate_parameters(x, y, solver=solver, return_condition=True)
+        assert len(result) == 7
+        assert np.allclose(result[:6], expected, rtol=1e-12)
+        assert 1 < result[6] < 100
+    
+    x = 1e15 + np.arange(1000.0)
+    y = 3.0 * (x - 1e15) + 2.0
+    m, c, *_, cond = calculate_parameters(x, y, return_condition=True)
+    assert abs(m - 3.0) < 1e-9
+    assert cond > 1e12
+
+if __name__ == "__main__":
+    pytest.main(["-v", __file__])
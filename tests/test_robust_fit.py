@@ -0,0 +1,62 @@
+"""
+测试加权与稳健直线拟合
+"""
+
+import numpy as np
+import pytest
+import solutions.robust_fit as robust_fit
+from solutions.millikan_fit_solution import fit_line, load_data
+
+DATA_FILE = 'data/millikan.txt'
+
+def test_ols_and_wls():
+    """测试普通与加权最小二乘及其标准误差"""
+    x, y = load_data(DATA_FILE)
+    m, c, m_err, c_err = fit_line(x, y)
+    assert np.allclose([m, c], np.polyfit(x, y, 1))
+    assert m_err > 0 and c_err > 0
+    
+    # 等权的WLS与OLS斜率相同，误差按给定sigma计算
+    m_w, c_w, m_err_w, _ = fit_line(x, y, method='wls', sigma=0.1)
+    assert np.isclose(m_w, m) and np.isclose(c_w, c)
+    assert np.isclose(m_err_w, 0.1 / np.sqrt(((x - x.mean()) ** 2).sum()))
+    with pytest.raises(ValueError):
+        fit_line(x, y, method='wls')
+
+@pytest.mark.parametrize('method', ['huber', 'tukey', 'theil_sen'])
+def test_robust_methods_resist_outlier(method):
+    """测试稳健方法不受单个离群点影响"""
+    rng = np.random.default_rng(0)
+    x = np.linspace(5e14, 1.2e15, 40)
+    y = 4.1e-15 * x - 1.7 + rng.normal(0, 0.01, 40)
+    y[5] += 3.0
+    m, c, m_err, c_err = fit_line(x, y, method=method)
+    assert abs(m - 4.1e-15) / 4.1e-15 < 0.01
+    assert abs(fit_line(x, y)[0] - 4.1e-15) / 4.1e-15 > 0.05
+    assert 0 < m_err < 1e-16 and c_err > 0
+
+def test_theil_sen_selection_matches_brute_force(monkeypatch):
+    """测试Theil–Sen的随机选择与枚举全部点对结果一致（含x重复的点）"""
+    rng = np.random.default_rng(1)
+    x = np.round(rng.normal(size=1500), 2)
+    y = 2 * x + rng.standard_cauchy(1500)
+    expected = fit_line(x, y, method='theil_sen')[0]
+    monkeypatch.setattr(robust_fit, 'THEIL_SEN_BRUTE_PAIRS', 0)
+    monkeypatch.setattr(robust_fit, 'THEIL_SEN_SAMPLE', 1000)
+    assert fit_line(x, y, method='theil_sen')[0] == expected
+    monkeypatch.setattr(robust_fit, 'THEIL_SEN_MAX_ROUNDS', 0)
+    assert fit_line(x, y, method='theil_sen')[0] == expected
+
+def test_theil_sen_exact_line_majority():
+    """测试大量点对斜率恰好相等时Theil–Sen仍能结束（点对数超过枚举上限）"""
+    x = np.arange(10000.)
+    m, c = fit_line(x, 2 * x + 1, method='theil_sen')[:2]
+    assert m == 2 and np.isclose(c, 1)
+
+    rng = np.random.default_rng(2)
+    x = rng.permutation(5000).astype(float)
+    y = 2 * x + 1
+    outliers = rng.random(5000) < 0.3
+    y[outliers] += rng.normal(0, 1000, outliers.sum())
+    assert 5000 * 4999 // 2 > robust_fit.THEIL_SEN_BRUTE_PAIRS
+    assert fit_line(x, y, method='theil_sen')[0] == 2